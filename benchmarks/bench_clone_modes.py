@@ -0,0 +1,38 @@
+import sys
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repo_searcher import CLONE_MODES, RepoSearcher, format_size
+
+
+class UrlRepoSearcher(RepoSearcher):
+    """RepoSearcher que usa a URL informada diretamente (file://, ssh ou https)."""
+
+    def build_url(self, repo_name: str) -> str:
+        return repo_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: tempo de clone e espaço em disco por modo")
+    parser.add_argument("urls", nargs="+", help="URLs dos repositórios (ex: file:///srv/repo.git)")
+    parser.add_argument("--modes", nargs="+", choices=CLONE_MODES, default=list(CLONE_MODES))
+    args = parser.parse_args()
+
+    print(f"{'modo':<10}{'repositório':<50}{'tempo':>10}{'disco':>14}")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory(prefix=f"bench_clone_{mode}_") as tmp:
+            searcher = UrlRepoSearcher(token="", base_dir=Path(tmp), clone_mode=mode)
+            for url in args.urls:
+                repo_path = searcher.repo_path_for(url.rstrip("/").split("/")[-1])
+                if searcher.clone_or_update_repo(url, url, repo_path, print) is None:
+                    continue
+                stats = searcher.clone_stats[url]
+                print(f"{mode:<10}{url[-48:]:<50}{stats['seconds']:>9.2f}s"
+                      f"{format_size(stats['disk_bytes']):>14}")
+
+
+if __name__ == "__main__":
+    main()
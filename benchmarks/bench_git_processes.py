@@ -0,0 +1,205 @@
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_suite import SyntheticRepoSearcher, generate_repos, push_update
+from git_objects import CatFileBatch, resolve_commit
+
+try:
+    import git
+except ImportError:
+    git = None
+
+
+@contextmanager
+def count_processes():
+    """Conta todo subprocesso iniciado (inclusive pelo GitPython), pelo subcomando do git."""
+    counts = Counter()
+    lock = threading.Lock()
+    original = subprocess.Popen.__init__
+
+    def counting_init(self, args, *rest, **kwargs):
+        argv = [str(arg) for arg in args] if isinstance(args, (list, tuple)) else [str(args)]
+        command = next((arg for arg in argv[1:] if not arg.startswith("-") and "/" not in arg
+                        and "\\" not in arg), Path(argv[0]).name)
+        with lock:
+            counts[command] += 1
+        original(self, args, *rest, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init
+    try:
+        yield counts
+    finally:
+        subprocess.Popen.__init__ = original
+
+
+class PerCallGitPool:
+    """Caminho anterior ao GitProcessPool: um rev-parse por resolução de ref e um
+    ``cat-file --batch`` novo a cada busca em repositório."""
+
+    def __init__(self):
+        self._batches = []
+        self._lock = threading.Lock()
+
+    def resolve_commit(self, repo_path: Path, ref: str) -> str:
+        return resolve_commit(repo_path, ref)
+
+    def batch(self, repo_path: Path) -> CatFileBatch:
+        batch = CatFileBatch(repo_path)
+        with self._lock:
+            self._batches.append(batch)
+        return batch
+
+    def release(self, repo_path: Path):
+        path = Path(repo_path).resolve()
+        with self._lock:
+            released = [batch for batch in self._batches if batch.repo_path.resolve() == path]
+            self._batches = [batch for batch in self._batches if batch not in released]
+        for batch in released:
+            batch.close()
+
+    def close(self):
+        with self._lock:
+            batches, self._batches = self._batches, []
+        for batch in batches:
+            batch.close()
+
+
+class PerCallRepoSearcher(SyntheticRepoSearcher):
+    """RepoSearcher como era antes do pool: clone, verificação e atualização pelo GitPython,
+    com um git.Repo (e os processos dele) por chamada."""
+
+    def __init__(self, remotes_dir: Path, **kwargs):
+        super().__init__(remotes_dir, **kwargs)
+        self.git_pool = PerCallGitPool()
+
+    def _freshness_refs(self, repo_path: Path, config=None):
+        repo = git.Repo(repo_path)
+        if self.search_ref != "HEAD":
+            local_ref = self.search_ref if repo.bare else f"origin/{self.search_ref}"
+            return f"refs/heads/{self.search_ref}", local_ref
+        try:
+            tracking = repo.active_branch.tracking_branch()
+            remote_ref = f"refs/heads/{tracking.remote_head}" if tracking else "HEAD"
+        except TypeError:
+            # HEAD destacado
+            remote_ref = "HEAD"
+        return remote_ref, "HEAD"
+
+    def _local_head(self, repo_path: Path, config=None) -> Optional[str]:
+        _, local_ref = self._freshness_refs(repo_path)
+        try:
+            return git.Repo(repo_path).commit(local_ref).hexsha
+        except (ValueError, git.exc.BadName):
+            return None
+
+    def _remote_head(self, repo_path: Path, repo_url: str, config=None) -> Optional[str]:
+        remote_ref, _ = self._freshness_refs(repo_path)
+        try:
+            output = git.Repo(repo_path).git.ls_remote(repo_url, remote_ref)
+        except git.exc.GitCommandError:
+            return None
+        return output.split()[0] if output else None
+
+    def _clone(self, repo_url: str, repo_path: Path, reference: Optional[Path] = None):
+        if self.clone_mode == "shallow":
+            git.Repo.clone_from(repo_url, repo_path, depth=1, single_branch=True)
+        elif self.clone_mode == "partial":
+            git.Repo.clone_from(repo_url, repo_path, filter="blob:none")
+        elif self.clone_mode == "mirror":
+            git.Repo.clone_from(repo_url, repo_path, mirror=True)
+        else:
+            git.Repo.clone_from(repo_url, repo_path)
+
+    def _update(self, repo_path: Path, config):
+        repo = git.Repo(repo_path)
+        origin = repo.remotes.origin
+        if self.clone_mode == "mirror":
+            origin.fetch(prune=True)
+        elif self.clone_mode == "shallow":
+            tracking = repo.active_branch.tracking_branch()
+            origin.fetch(tracking.remote_head, depth=1)
+            repo.git.reset("--hard", tracking.name)
+        else:
+            origin.pull(rebase=True)
+
+
+def counted_search(searcher_class, root: Path, base_dir: Path, names: list,
+                   **kwargs) -> Tuple[Counter, float]:
+    searcher = searcher_class(root / "remotes", base_dir=base_dir, **kwargs)
+    with count_processes() as counts:
+        start = time.perf_counter()
+        searcher.search_repos(names, "TARGET_TOKEN")
+        elapsed = time.perf_counter() - start
+    return counts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Conta os processos iniciados em clone, verificação e atualização de repositórios")
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--file-size", type=int, default=1024)
+    parser.add_argument("--binary-ratio", type=float, default=0.0)
+    parser.add_argument("--match-density", type=float, default=0.01)
+    parser.add_argument("--changed-files", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clone-modes", nargs="+", default=["full", "mirror"],
+                        choices=("full", "shallow", "partial", "mirror"))
+    parser.add_argument("--backends", nargs="+", default=["thread", "git"],
+                        choices=("thread", "process", "git"))
+    args = parser.parse_args()
+
+    # Antes: GitPython e um processo por chamada; depois: config/refs lidos direto e cat-file no pool
+    variants = {"depois": SyntheticRepoSearcher}
+    if git is not None:
+        variants = {"antes": PerCallRepoSearcher, **variants}
+    else:
+        print("⚠️ GitPython não instalado: sem a medição do caminho anterior (antes)")
+
+    with tempfile.TemporaryDirectory(prefix="bench_git_processes_") as tmp:
+        root = Path(tmp)
+        names = generate_repos(root, args)
+        round_number = 0
+        for mode in args.clone_modes:
+            for backend in args.backends:
+                options = {"clone_mode": mode, "search_backend": backend}
+                phases = {}
+                for variant, searcher_class in variants.items():
+                    base_dir = root / f"clones_{mode}_{backend}_{variant}"
+                    base_dir.mkdir()
+                    phases[("clone", variant)] = counted_search(
+                        searcher_class, root, base_dir, names, **options)
+                    phases[("verificação", variant)] = counted_search(
+                        searcher_class, root, base_dir, names, **options)
+                    phases[("verificação (TTL)", variant)] = counted_search(
+                        searcher_class, root, base_dir, names, freshness_ttl=3600, **options)
+                push_update(root, names, args, round_number)
+                round_number += 1
+                for variant, searcher_class in variants.items():
+                    base_dir = root / f"clones_{mode}_{backend}_{variant}"
+                    phases[("atualização", variant)] = counted_search(
+                        searcher_class, root, base_dir, names, **options)
+
+                print(f"\n{mode}/{backend} ({len(names)} repositório(s)):")
+                for phase in ("clone", "verificação", "verificação (TTL)", "atualização"):
+                    for variant in variants:
+                        counts, elapsed = phases[(phase, variant)]
+                        total = sum(counts.values())
+                        detail = ", ".join(f"{command}: {count}"
+                                           for command, count in counts.most_common())
+                        print(f"   {phase:<18} {variant:<7} {total:5d} processo(s), "
+                              f"{total / len(names):5.1f} por repositório, {elapsed:6.2f}s ({detail})")
+
+
+if __name__ == "__main__":
+    main()
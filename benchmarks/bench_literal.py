@@ -0,0 +1,77 @@
+import re
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_scan import generate_repo
+from search_engine import compile_pattern, list_repo_files, read_text, search_file, search_text
+
+
+def run(texts, patterns):
+    start = time.perf_counter()
+    results = []
+    for rel_path, text in texts:
+        for pattern in patterns:
+            results.extend(search_text(text, rel_path, pattern, "bench"))
+    return time.perf_counter() - start, results
+
+
+def run_files(repo_path: Path, rel_paths, patterns):
+    # Cada padrão é uma passada completa: lê e decodifica todos os arquivos de novo
+    start = time.perf_counter()
+    results = []
+    for pattern in patterns:
+        for rel_path in rel_paths:
+            results.extend(search_file(repo_path, rel_path, pattern, "bench"))
+    return time.perf_counter() - start, results
+
+
+def result_lines(results):
+    return sorted((r["file"], r["line_number"]) for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: busca literal e vários termos numa passada")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--query", default="TARGET_TOKEN")
+    parser.add_argument("--terms", default="TARGET_TOKEN;load;missing_name;config value")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_literal_") as tmp:
+        repo_path = Path(tmp)
+        print(f"📝 Gerando {args.files} arquivos x {args.lines} linhas...")
+        generate_repo(repo_path, args.files, args.lines)
+        # Leitura fora da medição: só o custo da busca no texto entra na conta
+        rel_paths = list_repo_files(repo_path)
+        texts = [(rel_path, read_text(repo_path / rel_path)) for rel_path in rel_paths]
+
+        regex = re.compile(re.escape(args.query), re.IGNORECASE)
+        regex_time, regex_results = run(texts, [regex])
+        literal_time, literal_results = run(texts, [compile_pattern(args.query)])
+        print(f"   regex IGNORECASE: {regex_time:.3f}s ({len(regex_results)} resultado(s))")
+        print(f"   literal (find):   {literal_time:.3f}s ({len(literal_results)} resultado(s))")
+        if regex_results != literal_results:
+            print("❌ Resultados divergentes na busca literal!")
+            sys.exit(1)
+
+        terms = [term for term in args.terms.split(";") if term]
+        separate_time, separate_results = run_files(repo_path, rel_paths,
+                                                    [compile_pattern(term) for term in terms])
+        multi_time, multi_results = run_files(repo_path, rel_paths, [compile_pattern(terms)])
+        print(f"   {len(terms)} passadas:      {separate_time:.3f}s ({len(separate_results)} resultado(s))")
+        print(f"   1 passada:        {multi_time:.3f}s ({len(multi_results)} resultado(s))")
+        # A busca separada não marca o termo; compara só arquivo/linha
+        if result_lines(multi_results) != result_lines(separate_results):
+            print("❌ Resultados divergentes na busca com vários termos!")
+            sys.exit(1)
+        print(f"✅ Resultados idênticos — literal {regex_time / literal_time:.1f}x, "
+              f"vários termos {separate_time / multi_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import gc
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from path_filters import format_size
+from result_set import ResultSet
+
+
+def generate_results(count: int, repos: int, files_per_repo: int, hits_per_file: int):
+    """Resultados como o pipeline produz: repo e arquivo compartilhados, linha nova por hit."""
+    produced = 0
+    while True:
+        for r in range(repos):
+            repo = f"grupo/subgrupo/repositorio-{r}"
+            for f in range(files_per_repo):
+                rel_path = f"src/modulo_{f // 20}/arquivo_{f}.py"
+                for line_number in range(1, hits_per_file + 1):
+                    if produced == count:
+                        return
+                    yield {
+                        "repo": repo,
+                        "file": rel_path,
+                        "line_number": line_number * 7,
+                        "line": f"config = load_settings('TARGET_TOKEN', {produced})",
+                    }
+                    produced += 1
+
+
+def measure(label: str, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<18} {format_size(current):>10} retidos, pico {format_size(peak):>10}, "
+          f"{elapsed:.2f}s ({len(container)} resultado(s))")
+    return current, container
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: memória de list[dict] vs ResultSet")
+    parser.add_argument("--results", type=int, default=1_000_000)
+    parser.add_argument("--repos", type=int, default=200)
+    parser.add_argument("--files-per-repo", type=int, default=500)
+    parser.add_argument("--hits-per-file", type=int, default=10)
+    args = parser.parse_args()
+
+    def source():
+        return generate_results(args.results, args.repos, args.files_per_repo, args.hits_per_file)
+
+    print(f"📝 {args.results} resultado(s) em {args.repos} repositório(s)...")
+    dict_bytes, dicts = measure("list[dict]", lambda: list(source()))
+    del dicts
+    compact_bytes, compact = measure("ResultSet", lambda: ResultSet(source()))
+
+    del compact
+    expected = list(generate_results(10_000, args.repos, args.files_per_repo, args.hits_per_file))
+    if list(ResultSet(expected)) != expected:
+        print("❌ ResultSet não reproduz os resultados originais!")
+        sys.exit(1)
+    print(f"✅ ResultSet usa {dict_bytes / compact_bytes:.1f}x menos memória")
+
+
+if __name__ == "__main__":
+    main()
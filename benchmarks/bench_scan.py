@@ -0,0 +1,69 @@
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_engine import compile_pattern, list_repo_files, search_file
+
+
+WORDS = ["def", "class", "return", "import", "self", "value", "config", "result",
+         "items", "for", "in", "if", "else", "None", "True", "print", "data"]
+
+
+def generate_repo(root: Path, files: int, lines_per_file: int, seed: int = 42):
+    """Gera um repositório sintético com uma linha rara (TARGET_TOKEN) a cada ~500 linhas."""
+    rng = random.Random(seed)
+    for i in range(files):
+        file_path = root / f"pkg{i % 50}" / f"module_{i}.py"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for _ in range(lines_per_file):
+            if rng.random() < 0.002:
+                lines.append("    TARGET_TOKEN = load()\n")
+            else:
+                lines.append("    " + " ".join(rng.choices(WORDS, k=8)) + "\n")
+        file_path.write_text("".join(lines), encoding="utf-8")
+
+
+def run_scan(repo_path: Path, rel_paths, search_string: str, scan_mode: str):
+    pattern = compile_pattern(search_string)
+    start = time.perf_counter()
+    results = []
+    for rel_path in rel_paths:
+        results.extend(search_file(repo_path, rel_path, pattern, "bench", scan_mode=scan_mode))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: busca linha a linha vs buffer inteiro")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--query", default="TARGET_TOKEN")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_scan_") as tmp:
+        repo_path = Path(tmp)
+        print(f"📝 Gerando {args.files} arquivos x {args.lines} linhas...")
+        generate_repo(repo_path, args.files, args.lines)
+        rel_paths = list_repo_files(repo_path)
+
+        timings = {}
+        outputs = {}
+        for scan_mode in ("line", "buffer"):
+            run_scan(repo_path, rel_paths[:50], args.query, scan_mode)
+            timings[scan_mode], outputs[scan_mode] = run_scan(repo_path, rel_paths, args.query, scan_mode)
+            print(f"   {scan_mode:>6}: {timings[scan_mode]:.3f}s "
+                  f"({len(outputs[scan_mode])} resultado(s))")
+
+        if outputs["line"] != outputs["buffer"]:
+            print("❌ Resultados divergentes entre os modos!")
+            sys.exit(1)
+        print(f"✅ Resultados idênticos — speedup: {timings['line'] / timings['buffer']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
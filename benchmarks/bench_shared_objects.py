@@ -0,0 +1,93 @@
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_suite import GIT_IDENTITY, SyntheticRepoSearcher, write_files
+from git_objects import run_git
+from metrics import SearchMetrics
+from path_filters import format_size
+from repo_searcher import directory_size
+
+
+def generate_family(root: Path, args) -> list:
+    """Cria um repositório base e forks com poucos arquivos alterados, todos no mesmo grupo."""
+    base_dir = root / "work" / "base"
+    base_dir.mkdir(parents=True)
+    write_files(base_dir, random.Random(args.seed), args.files, args.file_size, 0.05, 0.002)
+    run_git(base_dir, "init", "-q", "-b", "master")
+    run_git(base_dir, "add", "-A")
+    run_git(base_dir, *GIT_IDENTITY, "commit", "-q", "-m", "initial")
+
+    names = []
+    for f in range(args.forks):
+        name = f"family/fork_{f}"
+        work_dir = root / "work" / f"fork_{f}"
+        run_git(root, "clone", "-q", str(base_dir), str(work_dir))
+        rng = random.Random(args.seed * 100 + f)
+        changed = rng.sample(range(args.files), min(args.changed_files, args.files))
+        write_files(work_dir, rng, args.files, args.file_size, 0.05, 0.002, only=changed)
+        run_git(work_dir, "add", "-A")
+        run_git(work_dir, *GIT_IDENTITY, "commit", "-q", "-m", f"fork {f}")
+        run_git(root, "clone", "-q", "--bare", str(work_dir), str(root / "remotes" / f"{name}.git"))
+        names.append(name)
+    return names
+
+
+def cold_clone(root: Path, names: list, shared: bool, args) -> dict:
+    base_dir = root / ("clones_shared" if shared else "clones_standalone")
+    base_dir.mkdir()
+    metrics = SearchMetrics()
+    searcher = SyntheticRepoSearcher(root / "remotes", base_dir=base_dir, metrics=metrics,
+                                     shared_objects=shared, fetch_workers=args.fetch_workers)
+    start = time.perf_counter()
+    searcher.search_repos(names, "TARGET_TOKEN")
+    wall = time.perf_counter() - start
+    if shared:
+        report = searcher.shared_store_report()
+        object_bytes = sum(entry["store_bytes"] + entry["local_bytes"] for entry in report)
+    else:
+        report = []
+        object_bytes = sum(directory_size(base_dir / name.replace("/", "_") / ".git" / "objects")
+                           for name in names)
+    return {"wall": wall, "object_bytes": object_bytes, "report": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara clones frios de forks parecidos com e sem o store de objetos compartilhado")
+    parser.add_argument("--forks", type=int, default=6)
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--changed-files", type=int, default=10,
+                        help="Arquivos alterados em cada fork em relação à base")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_shared_") as tmp:
+        root = Path(tmp)
+        print(f"📝 Gerando base com {args.files} arquivo(s) e {args.forks} fork(s) "
+              f"com {args.changed_files} arquivo(s) alterado(s) cada...")
+        names = generate_family(root, args)
+
+        standalone = cold_clone(root, names, shared=False, args=args)
+        shared = cold_clone(root, names, shared=True, args=args)
+
+        print(f"   independentes: {standalone['wall']:6.2f}s, objetos em disco "
+              f"{format_size(standalone['object_bytes'])}")
+        print(f"   store comum:   {shared['wall']:6.2f}s, objetos em disco "
+              f"{format_size(shared['object_bytes'])}")
+        for entry in shared["report"]:
+            print(f"   {Path(entry['store']).name}: {entry['repos']} repositório(s), "
+                  f"disco economizado {format_size(entry['disk_saved_bytes'])}, "
+                  f"transferência {format_size(entry['transfer_bytes'])} em vez de "
+                  f"{format_size(entry['standalone_transfer_bytes'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from git_objects import run_git
+from metrics import SearchMetrics
+from path_filters import format_size
+from repo_searcher import RepoSearcher
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+WORDS = ["def", "class", "return", "import", "self", "value", "config", "result",
+         "items", "for", "in", "if", "else", "None", "True", "print", "data"]
+QUERIES = {
+    "literal": "TARGET_TOKEN",
+    "regex": r"def \w+_handler\(",
+    "common": "import",
+    "no_match": "ZZZ_NEVER_PRESENT",
+    "multi": ["TARGET_TOKEN", "FIXME", "api_key"],
+}
+GIT_IDENTITY = ("-c", "user.name=bench", "-c", "user.email=bench@localhost")
+
+
+class SyntheticRepoSearcher(RepoSearcher):
+    """Clona dos remotos bare locais (file://) gerados pelo benchmark."""
+
+    def __init__(self, remotes_dir: Path, **kwargs):
+        super().__init__(token="", **kwargs)
+        self.remotes_dir = remotes_dir
+
+    def build_url(self, repo_name: str) -> str:
+        return (self.remotes_dir / f"{repo_name}.git").as_uri()
+
+
+def text_file(rng: random.Random, size: int, match_density: float) -> str:
+    lines = []
+    written = 0
+    while written < size:
+        roll = rng.random()
+        if roll < match_density:
+            line = "    TARGET_TOKEN = load_settings()  # FIXME api_key\n"
+        elif roll < match_density * 2:
+            line = f"def {rng.choice(WORDS)}_handler(request):\n"
+        else:
+            line = "    " + " ".join(rng.choices(WORDS, k=8)) + "\n"
+        lines.append(line)
+        written += len(line)
+    return "".join(lines)
+
+
+def write_files(work_dir: Path, rng: random.Random, files: int, file_size: int,
+                binary_ratio: float, match_density: float, only=None):
+    for i in range(files) if only is None else only:
+        size = max(64, int(file_size * rng.uniform(0.5, 1.5)))
+        if rng.random() < binary_ratio:
+            path = work_dir / f"assets{i % 10}" / f"blob_{i}.bin"
+            content = rng.randbytes(size).replace(b"\0", b"\1") + b"\0"
+        else:
+            path = work_dir / f"pkg{i % 20}" / f"module_{i}.py"
+            content = text_file(rng, size, match_density).encode("utf-8")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+def generate_repos(root: Path, args) -> list:
+    """Cria repositórios de trabalho em root/work e remotos bare em root/remotes."""
+    names = []
+    for r in range(args.repos):
+        name = f"synthetic_{r}"
+        work_dir = root / "work" / name
+        work_dir.mkdir(parents=True)
+        rng = random.Random(args.seed + r)
+        write_files(work_dir, rng, args.files, args.file_size, args.binary_ratio, args.match_density)
+        run_git(work_dir, "init", "-q", "-b", "master")
+        run_git(work_dir, "add", "-A")
+        run_git(work_dir, *GIT_IDENTITY, "commit", "-q", "-m", "initial")
+        run_git(root, "clone", "-q", "--bare", str(work_dir), str(root / "remotes" / f"{name}.git"))
+        names.append(name)
+    return names
+
+
+def push_update(root: Path, names: list, args, round_number: int):
+    """Altera --changed-files arquivos por repositório e publica no remoto."""
+    for r, name in enumerate(names):
+        work_dir = root / "work" / name
+        rng = random.Random(args.seed * 1000 + r * 10 + round_number)
+        changed = rng.sample(range(args.files), min(args.changed_files, args.files))
+        write_files(work_dir, rng, args.files, args.file_size, args.binary_ratio,
+                    args.match_density, only=changed)
+        run_git(work_dir, "add", "-A")
+        run_git(work_dir, *GIT_IDENTITY, "commit", "-q", "-m", f"update {round_number}")
+        run_git(work_dir, "push", "-q", str(root / "remotes" / f"{name}.git"), "HEAD:master")
+
+
+def timed_search(root: Path, base_dir: Path, names: list, query, **kwargs) -> dict:
+    metrics = SearchMetrics()
+    searcher = SyntheticRepoSearcher(root / "remotes", base_dir=base_dir, metrics=metrics, **kwargs)
+    start = time.perf_counter()
+    results = searcher.search_repos(names, query)
+    wall = time.perf_counter() - start
+    totals = metrics.totals()
+    fetch = totals.get("fetch", {})
+    search = totals.get("search", {})
+    return {
+        "wall_seconds": round(wall, 4),
+        "fetch_seconds": round(fetch.get("seconds", 0), 4),
+        "fetch_bytes": int(fetch.get("bytes", 0)),
+        "list_seconds": round(totals.get("list_files", {}).get("seconds", 0), 4),
+        "search_seconds": round(search.get("seconds", 0), 4),
+        "match_seconds": round(search.get("match_seconds", 0), 4),
+        "files_scanned": int(search.get("files_scanned", 0)),
+        "bytes_scanned": int(search.get("bytes_scanned", 0)),
+        "matches": len(results),
+    }
+
+
+def run_suite(args) -> dict:
+    measurements = {}
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        root = Path(tmp)
+        print(f"📝 Gerando {args.repos} repositório(s) x {args.files} arquivo(s) "
+              f"(~{format_size(args.file_size)} cada, {args.binary_ratio:.0%} binários)...")
+        names = generate_repos(root, args)
+
+        for mode in args.clone_modes:
+            base_dir = root / f"clones_{mode}"
+            base_dir.mkdir()
+            cold = timed_search(root, base_dir, names, QUERIES["literal"], clone_mode=mode,
+                                fetch_workers=args.fetch_workers)
+            push_update(root, names, args, round_number=len(measurements))
+            warm = timed_search(root, base_dir, names, QUERIES["literal"], clone_mode=mode,
+                                fetch_workers=args.fetch_workers)
+            measurements[f"clone_cold/{mode}"] = cold
+            measurements[f"update_warm/{mode}"] = warm
+            print(f"   clone {mode:<8} frio {cold['fetch_seconds']:7.2f}s "
+                  f"({format_size(cold['fetch_bytes'])}), atualização {warm['fetch_seconds']:7.2f}s "
+                  f"({format_size(warm['fetch_bytes'])})")
+
+        # Busca com clones já atualizados: o TTL evita o ls-remote e isola o custo da busca
+        base_dir = root / f"clones_{args.clone_modes[0]}"
+        for backend in args.backends:
+            for query_name, query in QUERIES.items():
+                search = timed_search(root, base_dir, names, query, search_backend=backend,
+                                      clone_mode=args.clone_modes[0], freshness_ttl=3600,
+                                      search_workers=args.search_workers)
+                measurements[f"search/{backend}/{query_name}"] = search
+                print(f"   busca {backend:<8} {query_name:<10} {search['wall_seconds']:7.2f}s "
+                      f"(regex {search['match_seconds']:.2f}s, {search['matches']} resultado(s))")
+    return measurements
+
+
+def environment() -> dict:
+    try:
+        git_version = run_git(Path.cwd(), "--version").decode().strip()
+    except Exception:
+        git_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "git": git_version,
+    }
+
+
+def compare(current: dict, params: dict, previous_file: Path):
+    saved = json.loads(previous_file.read_text(encoding="utf-8"))
+    previous = saved["measurements"]
+    print(f"\n📊 Comparação com {previous_file.name} (tempo total):")
+    different = sorted(key for key in params if saved["params"].get(key) != params[key]
+                       and key != "label")
+    if different:
+        print(f"   ⚠️ Parâmetros diferentes: {', '.join(different)}")
+    for name, values in current.items():
+        before = previous.get(name)
+        if not before or not before["wall_seconds"]:
+            continue
+        ratio = values["wall_seconds"] / before["wall_seconds"]
+        print(f"   {name:<32} {before['wall_seconds']:8.2f}s -> {values['wall_seconds']:8.2f}s "
+              f"({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Suíte de benchmarks com repositórios git sintéticos servidos por file://")
+    parser.add_argument("--repos", type=int, default=4)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--file-size", type=int, default=4096, help="Tamanho médio em bytes")
+    parser.add_argument("--binary-ratio", type=float, default=0.05)
+    parser.add_argument("--match-density", type=float, default=0.002,
+                        help="Fração das linhas com o termo buscado")
+    parser.add_argument("--changed-files", type=int, default=20,
+                        help="Arquivos alterados por repositório na atualização")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clone-modes", nargs="+", default=["full", "shallow"],
+                        choices=("full", "shallow", "partial", "mirror"))
+    parser.add_argument("--backends", nargs="+", default=["thread", "process", "git"],
+                        choices=("thread", "process", "git"))
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--search-workers", type=int, default=2)
+    parser.add_argument("--label", default="", help="Rótulo incluído no nome do arquivo salvo")
+    parser.add_argument("--compare", type=Path, metavar="ARQUIVO",
+                        help="Resultado anterior para comparar")
+    args = parser.parse_args()
+
+    measurements = run_suite(args)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = RESULTS_DIR / f"{stamp}{'_' + args.label if args.label else ''}.json"
+    params = {key: value for key, value in vars(args).items() if key != "compare"}
+    output.write_text(json.dumps({
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": params,
+        "measurements": measurements,
+    }, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"✅ Resultados salvos em {output}")
+
+    if args.compare:
+        compare(measurements, params, args.compare)
+
+
+if __name__ == "__main__":
+    main()
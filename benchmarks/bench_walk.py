@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from git_objects import list_worktree_files
+from path_filters import FileFilter
+from search_engine import list_repo_files, walk_repo_files
+
+
+def generate_tree(root: Path, files: int, files_per_dir: int, git_objects: int, vendored: int):
+    """Gera uma árvore com `files` arquivos de código, um .git com `git_objects` objetos
+    e um node_modules com `vendored` arquivos."""
+    for i in range(files):
+        dir_path = root / f"src{i // (files_per_dir * 10)}" / f"pkg{i // files_per_dir}"
+        if i % files_per_dir == 0:
+            dir_path.mkdir(parents=True, exist_ok=True)
+        (dir_path / f"file_{i}.py").touch()
+
+    for i in range(git_objects):
+        dir_path = root / ".git" / "objects" / f"{i % 256:02x}"
+        dir_path.mkdir(parents=True, exist_ok=True)
+        (dir_path / f"{i:038x}").touch()
+
+    for i in range(vendored):
+        dir_path = root / "node_modules" / f"lib{i // files_per_dir}"
+        if i % files_per_dir == 0:
+            dir_path.mkdir(parents=True, exist_ok=True)
+        (dir_path / f"index_{i}.js").touch()
+
+
+def legacy_walk(repo_path: Path):
+    """Travessia anterior: os.walk + `".git" in root` + Path.relative_to por arquivo."""
+    found = []
+    for root, _, files in os.walk(repo_path):
+        if ".git" in root:
+            continue
+        for file in files:
+            file_path = Path(root) / file
+            found.append(str(file_path.relative_to(repo_path)))
+    return found
+
+
+def walk_and_filter(repo_path: Path, file_filter: FileFilter):
+    """Caminho sem .gitignore: travessia com poda + filtro sobre os tamanhos já lidos."""
+    return file_filter.filter_entries(walk_repo_files(repo_path, skip_dir=file_filter.skip_dir))
+
+
+def ls_files_and_filter(repo_path: Path, file_filter: FileFilter):
+    """Caminho padrão (use_gitignore): git ls-files + filtro com stat por arquivo."""
+    return file_filter.filter_paths(repo_path, list_worktree_files(repo_path))
+
+
+def timed(label: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<32} {elapsed:8.3f}s  {len(result):>7} arquivo(s)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: enumeração de arquivos do repositório")
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument("--git-objects", type=int, default=20_000)
+    parser.add_argument("--vendored", type=int, default=20_000)
+    parser.add_argument("--no-git", action="store_true",
+                        help="Não medir o caminho com git ls-files (exige git init + add)")
+    args = parser.parse_args()
+    file_filter = FileFilter()
+
+    with tempfile.TemporaryDirectory(prefix="bench_walk_") as tmp:
+        root = Path(tmp)
+        print(f"📝 Gerando {args.files} arquivos, {args.git_objects} objetos em .git "
+              f"e {args.vendored} em node_modules...")
+        generate_tree(root, args.files, args.files_per_dir, args.git_objects, args.vendored)
+
+        # Primeira passada só aquece o cache de diretórios do sistema operacional
+        list_repo_files(root)
+        legacy = timed("os.walk (anterior)", legacy_walk, root)
+        scandir = timed("os.scandir", list_repo_files, root)
+        pruned = timed("os.scandir + poda node_modules", list_repo_files, root,
+                       skip_dir=FileFilter().skip_dir)
+        print(f"✅ speedup: {legacy / scandir:.1f}x sem poda, {legacy / pruned:.1f}x com poda")
+
+        # Enumerar não basta: o filtro de globs/tamanho roda sobre cada caminho listado
+        timed("os.scandir + FileFilter", walk_and_filter, root, file_filter)
+
+    if args.no_git or not shutil.which("git"):
+        return
+    with tempfile.TemporaryDirectory(prefix="bench_walk_git_") as tmp:
+        root = Path(tmp)
+        print("📝 Gerando a mesma árvore num repositório git (node_modules no .gitignore)...")
+        generate_tree(root, args.files, args.files_per_dir, 0, args.vendored)
+        (root / ".gitignore").write_text("node_modules/\n")
+        subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=root, check=True)
+        ls_files_and_filter(root, file_filter)
+        timed("git ls-files + FileFilter", ls_files_and_filter, root, file_filter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from search_engine import Query
+
+
+CACHE_VERSION = 2
+
+# (line_number, line, term, contexto) de cada match; term é None fora do modo de vários termos
+# e o contexto (linhas antes, linhas depois) só existe em buscas com context_lines
+BlobMatch = Tuple[int, str, Optional[str], Optional[Tuple[List[str], List[str]]]]
+
+
+def blob_query_key(search_string: Query, source: str, skip_binary: bool) -> str:
+    # Só o que muda o resultado de um conteúdo entra na chave: filtros de caminho e
+    # tamanho são aplicados antes da consulta ao cache
+    spec = {
+        "version": CACHE_VERSION,
+        "query": search_string if isinstance(search_string, str) else list(search_string),
+        "source": source,
+        "skip_binary": skip_binary,
+    }
+    encoded = json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def fan_out(matches: List[BlobMatch], repo_dirname: str, rel_path: str) -> List[Dict]:
+    results = []
+    for line_number, line, term, context in matches:
+        result = {"repo": repo_dirname, "file": rel_path, "line_number": line_number, "line": line}
+        if term is not None:
+            result["term"] = term
+        if context is not None:
+            result["context_before"] = list(context[0])
+            result["context_after"] = list(context[1])
+        results.append(result)
+    return results
+
+
+class BlobMatchCache:
+    """Matches de uma busca por hash de blob, para ler cada conteúdo uma única vez.
+
+    Os blobs com match ficam em memória durante a execução e são replicados para
+    todo repositório e caminho com o mesmo conteúdo. Os sem match (a grande maioria)
+    também são gravados em ``<cache_dir>/<chave>.nomatch`` e valem para as próximas
+    execuções da mesma busca: o conteúdo de um blob nunca muda. Um blob pulado sem
+    leitura da busca (ex: binário) guarda o motivo junto, para as estatísticas.
+    """
+
+    def __init__(self, cache_dir: Path, search_string: Query, source: str, skip_binary: bool,
+                 context_lines: int = 0):
+        # O contexto só muda os matches guardados em memória, não quais blobs não têm match
+        self.context_lines = context_lines
+        self.path = Path(cache_dir) / f"{blob_query_key(search_string, source, skip_binary)}.nomatch"
+        self._matches: Dict[str, List[BlobMatch]] = {}
+        self._no_match: Set[str] = set()
+        self._skipped: Dict[str, str] = {}
+        self._new_no_match: List[Tuple[str, Optional[str]]] = []
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    sha, _, reason = line.strip().partition("\t")
+                    if sha:
+                        self._no_match.add(sha)
+                        if reason:
+                            self._skipped[sha] = reason
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, sha: str) -> Optional[List[BlobMatch]]:
+        with self._lock:
+            if sha in self._no_match:
+                return []
+            return self._matches.get(sha)
+
+    def skip_reason(self, sha: str) -> Optional[str]:
+        with self._lock:
+            return self._skipped.get(sha)
+
+    def store(self, sha: str, results: List[Dict], skip_reason: Optional[str] = None):
+        # Só para blobs lidos até o fim: uma leitura interrompida não pode virar "sem match"
+        with self._lock:
+            if results:
+                self._matches[sha] = [
+                    (result["line_number"], result["line"], result.get("term"),
+                     (result["context_before"], result["context_after"])
+                     if "context_before" in result else None)
+                    for result in results
+                ]
+            elif sha not in self._no_match:
+                self._no_match.add(sha)
+                if skip_reason is not None:
+                    self._skipped[sha] = skip_reason
+                self._new_no_match.append((sha, skip_reason))
+
+    def save(self):
+        with self._lock:
+            if not self._new_no_match:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Só acrescenta: execuções simultâneas da mesma busca no máximo repetem hashes
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{sha}\t{reason}\n" if reason else f"{sha}\n"
+                                for sha, reason in self._new_no_match))
+            self._new_no_match = []
+
+
+class BlobCachePool:
+    """Caches de blobs mantidos em memória entre buscas (modo serviço).
+
+    Guarda os ``max_queries`` mais recentes; uma busca repetida reaproveita os matches
+    de todos os blobs já lidos, não só os "sem match" gravados em disco.
+    """
+
+    def __init__(self, cache_dir: Path, max_queries: int = 16):
+        self.cache_dir = Path(cache_dir)
+        self.max_queries = max(1, max_queries)
+        self._caches: "OrderedDict[Tuple[str, int], BlobMatchCache]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, search_string: Query, source: str, skip_binary: bool,
+            context_lines: int = 0) -> BlobMatchCache:
+        key = (blob_query_key(search_string, source, skip_binary), context_lines)
+        with self._lock:
+            cache = self._caches.get(key)
+            if cache is None:
+                cache = self._caches[key] = BlobMatchCache(self.cache_dir, search_string, source,
+                                                           skip_binary, context_lines)
+                while len(self._caches) > self.max_queries:
+                    self._caches.popitem(last=False)
+            else:
+                self._caches.move_to_end(key)
+            return cache
@@ -0,0 +1,354 @@
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from pathlib import Path
+from dotenv import load_dotenv
+
+from daemon_client import DEFAULT_DAEMON_ADDRESS, DaemonClient, DaemonError
+from git_objects import CLONE_MODES
+from metrics import SearchMetrics
+from path_filters import DEFAULT_EXCLUDES, DEFAULT_MAX_FILE_SIZE, FileFilter
+from result_set import ResultSet
+from result_sink import JsonlSink
+from search_engine import SCAN_MODES
+
+
+DEFAULT_GITLAB_URL = "https://gitlab.nelogica.com.br/"
+OUTPUT_FORMATS = ("text", "json", "jsonl")
+
+# Códigos de saída no estilo do grep, para uso em cron/CI
+EXIT_FOUND = 0
+EXIT_NOT_FOUND = 1
+EXIT_ERROR = 2
+
+
+def parse_args(argv=None):
+    """Lê a busca, a origem dos repositórios e as opções da linha de comando."""
+    parser = argparse.ArgumentParser(
+        description="Busca strings ou regex em vários repositórios GitLab/GitHub, sem interface gráfica.")
+    parser.add_argument("query", nargs="+",
+                        help="Termo ou regex; com mais de um, busca todos numa única passada")
+
+    source = parser.add_argument_group("repositórios")
+    source.add_argument("--repos", nargs="+", default=[], metavar="REPO",
+                        help="Repositórios no formato grupo/projeto")
+    source.add_argument("--repos-file", type=Path, metavar="ARQUIVO",
+                        help="Arquivo com repositórios (dono/nome): texto (um por linha), "
+                             "lista JSON ou {\"repos\": [...]}")
+    source.add_argument("--group", action="append", default=[], metavar="GRUPO",
+                        help="Grupo do GitLab, incluindo subgrupos (pode repetir)")
+    source.add_argument("--prefix", metavar="PREFIXO",
+                        help="Com --group, só repositórios cujo caminho começa com o prefixo")
+    source.add_argument("--refresh-groups", action="store_true",
+                        help="Ignorar o cache local das listagens de grupos")
+
+    remote = parser.add_argument_group("servidor")
+    remote.add_argument("--gitlab-url", default=os.getenv("GITLAB_URL", DEFAULT_GITLAB_URL))
+    remote.add_argument("--token", help="Token de acesso (padrão: GITLAB_TOKEN ou GITHUB_TOKEN)")
+    remote.add_argument("--github", action="store_true",
+                        help="Clonar do GitHub em vez do GitLab")
+    remote.add_argument("--daemon", nargs="?", const=DEFAULT_DAEMON_ADDRESS, metavar="ENDEREÇO",
+                        help="Buscar pelo serviço search_daemon (http://host:porta ou unix:/caminho; "
+                             f"padrão: REPO_SEARCH_DAEMON ou {DEFAULT_DAEMON_ADDRESS}). "
+                             "Clone, backend e cache passam a ser os do serviço")
+
+    execution = parser.add_argument_group("execução")
+    execution.add_argument("--base-dir", type=Path, default=Path("repos_temp"))
+    execution.add_argument("--fetch-workers", type=int, default=4)
+    execution.add_argument("--search-workers", type=int, default=2)
+    execution.add_argument("--backend", choices=("thread", "process", "git"), default="thread")
+    execution.add_argument("--process-workers", type=int)
+    execution.add_argument("--scan-mode", choices=SCAN_MODES, default="buffer")
+    execution.add_argument("--clone-mode", choices=CLONE_MODES, default="full")
+    execution.add_argument("--ref", default="HEAD",
+                           help="Ref buscada nos backends que leem objetos do git")
+    execution.add_argument("--freshness-ttl", type=float, default=0, metavar="SEGUNDOS",
+                           help="Pular o ls-remote de repositórios verificados há menos que isso")
+    execution.add_argument("--use-index", action="store_true", help="Usar índice de trigramas")
+    execution.add_argument("--incremental", action="store_true",
+                           help="Reler só os arquivos alterados desde a última execução desta busca")
+    execution.add_argument("--dedup-blobs", action="store_true",
+                           help="Ler cada conteúdo (hash de blob) uma vez só entre repositórios e caminhos, "
+                                "com cache persistente de blobs sem match em <base-dir>/.blobs")
+    execution.add_argument("--shared-objects", action="store_true",
+                           help="Clonar contra um store de objetos comum por grupo em <base-dir>/.objects "
+                                "(clone-mode full ou mirror)")
+
+    filters = parser.add_argument_group("filtros de arquivos")
+    filters.add_argument("--include", action="append", default=[], metavar="GLOB")
+    filters.add_argument("--exclude", action="append", default=None, metavar="GLOB",
+                         help=f"Padrão: {', '.join(DEFAULT_EXCLUDES)}")
+    filters.add_argument("--max-file-size", type=float, default=DEFAULT_MAX_FILE_SIZE / (1024 * 1024),
+                         metavar="MB", help="0 desativa o limite")
+    filters.add_argument("--include-binary", action="store_true")
+    filters.add_argument("--no-gitignore", action="store_true")
+
+    output = parser.add_argument_group("saída")
+    output.add_argument("--output", "-o", metavar="ARQUIVO",
+                        help="Arquivo de saída (padrão: stdout)")
+    output.add_argument("--format", choices=OUTPUT_FORMATS,
+                        help="Padrão: pela extensão de --output (.json, .jsonl, .jsonl.gz) ou text")
+    output.add_argument("--max-results", type=int, metavar="N",
+                        help="Parar a busca depois de N resultados")
+    output.add_argument("--context", "-C", type=int, default=0, metavar="N",
+                        help="Incluir N linhas antes e depois de cada resultado, capturadas na leitura "
+                             "(campos context_before/context_after no JSON)")
+    output.add_argument("--quiet", "-q", action="store_true",
+                        help="Não mostrar o progresso nem o resumo de métricas no stderr")
+    output.add_argument("--metrics", metavar="ARQUIVO",
+                        help="Gravar as métricas por repositório e fase como eventos JSON Lines")
+    return parser.parse_args(argv)
+
+
+def load_repos_file(path: Path) -> list:
+    """Lê a lista de repositórios (dono/nome) de um arquivo texto ou JSON."""
+    text = path.read_text(encoding="utf-8")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [line.strip() for line in text.splitlines()
+                if line.strip() and not line.startswith("#")]
+
+    if isinstance(data, dict):
+        data = data.get("repos", [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: esperado uma lista JSON ou {{\"repos\": [...]}}")
+    repos = []
+    for item in data:
+        # O campo "repo" de um arquivo de resultados é a pasta local do clone, não dono/nome
+        if not isinstance(item, str) or "/" not in item.strip("/"):
+            shown = "objeto JSON" if isinstance(item, dict) else repr(item)
+            raise ValueError(f"{path}: {shown} não é um repositório no formato dono/nome")
+        if item not in repos:
+            repos.append(item)
+    return repos
+
+
+def collect_repos(args, token: str) -> list:
+    """Junta os repositórios de --repos, --repos-file e --group, sem duplicatas."""
+    repos = list(args.repos)
+    if args.repos_file:
+        repos.extend(load_repos_file(args.repos_file))
+    if args.group:
+        # Import tardio: python-gitlab pesa na partida e o modo --daemon não precisa dele
+        from gitlab_collector import GitLabCollector
+        collector = GitLabCollector(token, args.gitlab_url)
+        repos.extend(collector.get_multiple_groups_repositories(
+            args.group, refresh=args.refresh_groups, prefix_filter=args.prefix))
+    return list(dict.fromkeys(repos))
+
+
+def output_format(args) -> str:
+    if args.format:
+        return args.format
+    if args.output and args.output.endswith((".jsonl", ".jsonl.gz")):
+        return "jsonl"
+    if args.output and args.output.endswith(".json"):
+        return "json"
+    return "text"
+
+
+def build_file_filter(args) -> FileFilter:
+    return FileFilter(
+        include=args.include,
+        exclude=DEFAULT_EXCLUDES if args.exclude is None else args.exclude,
+        max_file_size=int(args.max_file_size * 1024 * 1024) or None,
+        skip_binary=not args.include_binary,
+        use_gitignore=not args.no_gitignore,
+    )
+
+
+def write_results(args, results, repos: list) -> int:
+    """Grava os resultados no formato escolhido e devolve quantos foram escritos."""
+    fmt = output_format(args)
+    found = 0
+    collected = ResultSet() if fmt == "json" else None
+    sink = JsonlSink(args.output) if fmt == "jsonl" and args.output else None
+    out = open(args.output, "w", encoding="utf-8") if fmt == "text" and args.output else sys.stdout
+    try:
+        for result in results:
+            found += 1
+            if collected is not None:
+                collected.append(result)
+            elif sink is not None:
+                sink.write(result)
+            elif fmt == "jsonl":
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+            else:
+                term = f"[{result['term']}] " if "term" in result else ""
+                location = f"{result['repo']}:{result['file']}"
+                # Linhas de contexto no estilo do grep -C: "-" no lugar de ":" e "--" entre blocos
+                first = result["line_number"] - len(result.get("context_before", ()))
+                for offset, text in enumerate(result.get("context_before", ())):
+                    out.write(f"{location}-{first + offset}- {text}\n")
+                out.write(f"{location}:{result['line_number']}: {term}{result['line']}\n")
+                for offset, text in enumerate(result.get("context_after", ()), start=1):
+                    out.write(f"{location}-{result['line_number'] + offset}- {text}\n")
+                if "context_before" in result:
+                    out.write("--\n")
+
+        if collected is not None:
+            collected.group_by_repo(repos)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    collected.write_json(f)
+            else:
+                collected.write_json(sys.stdout)
+                sys.stdout.write("\n")
+    finally:
+        if sink is not None:
+            sink.close()
+        if out is not sys.stdout:
+            out.close()
+    return found
+
+
+def search_with_daemon(args, search_string, progress) -> int:
+    """Busca pelo search_daemon: os grupos são resolvidos e os clones mantidos pelo serviço."""
+    repos = list(args.repos)
+    if args.repos_file:
+        repos.extend(load_repos_file(args.repos_file))
+    if not repos and not args.group:
+        print("❌ Nenhum repositório informado (--repos, --repos-file ou --group)", file=sys.stderr)
+        return EXIT_ERROR
+
+    filters = {
+        "include": args.include,
+        "exclude": args.exclude,
+        "max_file_size": int(args.max_file_size * 1024 * 1024) or None,
+        "skip_binary": not args.include_binary,
+        "use_gitignore": not args.no_gitignore,
+    }
+    client = DaemonClient(args.daemon)
+    # Os repositórios de --group só são conhecidos no fim (resumo do serviço), para o --format json
+    searched = []
+
+    def results():
+        yield from client.iter_results(search_string, repos, args.group, args.prefix,
+                                       args.max_results, filters, args.ref,
+                                       progress if not args.quiet else None, args.context)
+        searched.extend(client.summary["repos"] if client.summary else repos)
+
+    progress(f"🔍 Buscando {search_string!r} via {args.daemon}...")
+    try:
+        found = write_results(args, results(), searched)
+    except KeyboardInterrupt:
+        client.cancel()
+        progress("⚠️ Busca interrompida")
+        return EXIT_ERROR
+    except DaemonError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    summary = f"✅ {found} resultado(s) encontrado(s)"
+    if client.summary:
+        summary += f" em {len(client.summary['repos'])} repositório(s), {client.summary['seconds']:.2f}s"
+        if client.summary["summary"]:
+            summary += f" — {client.summary['summary']}"
+    progress(summary)
+    return EXIT_FOUND if found else EXIT_NOT_FOUND
+
+
+def main(argv=None) -> int:
+    """Executa a busca e devolve o código de saída."""
+    load_dotenv()
+    args = parse_args(argv)
+
+    def progress(message):
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    search_string = args.query[0] if len(args.query) == 1 else args.query
+    if args.context < 0:
+        print("❌ --context deve ser 0 ou mais", file=sys.stderr)
+        return EXIT_ERROR
+    if args.daemon:
+        return search_with_daemon(args, search_string, progress)
+
+    token = args.token or os.getenv("GITHUB_TOKEN" if args.github else "GITLAB_TOKEN")
+    if not token:
+        print("❌ Token não informado (--token, GITLAB_TOKEN ou GITHUB_TOKEN)", file=sys.stderr)
+        return EXIT_ERROR
+
+    metrics_sink = JsonlSink(args.metrics, flush_interval=0) if args.metrics else None
+    metrics = SearchMetrics(hook=metrics_sink)
+    try:
+        with metrics.phase("enumerate") as enumeration:
+            repos = collect_repos(args, token)
+            enumeration["repos"] = len(repos)
+    except Exception as e:
+        print(f"❌ Erro ao listar repositórios: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if not repos:
+        print("❌ Nenhum repositório informado (--repos, --repos-file ou --group)", file=sys.stderr)
+        return EXIT_ERROR
+
+    args.base_dir.mkdir(parents=True, exist_ok=True)
+    if args.shared_objects and args.clone_mode not in ("full", "mirror"):
+        print("❌ --shared-objects exige --clone-mode full ou mirror", file=sys.stderr)
+        return EXIT_ERROR
+    if args.clone_mode == "shallow" and args.ref != "HEAD":
+        print("❌ --clone-mode shallow só traz o branch padrão: --ref exige full, partial ou mirror",
+              file=sys.stderr)
+        return EXIT_ERROR
+    from repo_searcher import RepoSearcher, shared_store_summary
+    searcher = RepoSearcher(
+        token,
+        base_dir=args.base_dir,
+        gitlab_url=None if args.github else args.gitlab_url,
+        fetch_workers=args.fetch_workers,
+        search_workers=args.search_workers,
+        search_backend=args.backend,
+        process_workers=args.process_workers,
+        scan_mode=args.scan_mode,
+        use_index=args.use_index,
+        freshness_ttl=args.freshness_ttl,
+        clone_mode=args.clone_mode,
+        search_ref=args.ref,
+        file_filter=build_file_filter(args),
+        incremental=args.incremental,
+        metrics=metrics,
+        shared_objects=args.shared_objects,
+        dedup_blobs=args.dedup_blobs,
+        context_lines=args.context,
+    )
+
+    progress(f"🔍 Buscando {search_string!r} em {len(repos)} repositório(s)...")
+    try:
+        found = write_results(
+            args, searcher.iter_results(repos, search_string, progress, args.max_results), repos)
+        # Antes de fechar --metrics: o relatório também vira um evento "shared_store"
+        store_report = searcher.shared_store_report() if args.shared_objects else []
+    except KeyboardInterrupt:
+        searcher.cancel()
+        progress("⚠️ Busca interrompida")
+        return EXIT_ERROR
+    except Exception as e:
+        print(f"❌ Erro durante a busca: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if metrics_sink is not None:
+            metrics_sink.close()
+
+    summary = f"✅ {found} resultado(s) encontrado(s)"
+    if searcher.filter_stats.files_skipped:
+        summary += f" — {searcher.filter_stats.summary()}"
+    progress(summary)
+    for entry in store_report:
+        progress(f"📦 {shared_store_summary(entry)}")
+    if searcher.git_process_counts:
+        detail = ", ".join(f"{command}: {count}" for command, count
+                           in sorted(searcher.git_process_counts.items(), key=lambda item: -item[1]))
+        progress(f"🔧 {sum(searcher.git_process_counts.values())} processo(s) git ({detail})")
+    enumerate_seconds = next(event["seconds"] for event in metrics.events
+                             if event["event"] == "enumerate")
+    progress(f"\n⏱️ Listagem de repositórios: {enumerate_seconds:.2f}s\n{metrics.summary_table()}")
+    return EXIT_FOUND if found else EXIT_NOT_FOUND
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import os
+import json
+import socket
+import threading
+import http.client
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Só biblioteca padrão: o cliente precisa iniciar rápido, sem GitPython nem python-gitlab
+DEFAULT_DAEMON_ADDRESS = os.getenv("REPO_SEARCH_DAEMON", "http://127.0.0.1:8765")
+
+
+class DaemonError(Exception):
+    pass
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DaemonClient:
+    """Cliente da API local do ``search_daemon``.
+
+    ``address`` é ``http://host:porta`` ou ``unix:/caminho/do/socket``. Os resultados
+    chegam em JSON Lines conforme o serviço os encontra; o resumo final fica em
+    ``summary``.
+    """
+
+    def __init__(self, address: str = DEFAULT_DAEMON_ADDRESS, timeout: Optional[float] = None):
+        self.address = address
+        self.timeout = timeout
+        self.summary: Optional[Dict] = None
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._cancelled = threading.Event()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        url = urlparse(self.address if "://" in self.address else f"http://{self.address}")
+        return http.client.HTTPConnection(url.hostname or "127.0.0.1", url.port or 8765,
+                                          timeout=self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None):
+        connection = self._connect()
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+        except OSError as e:
+            connection.close()
+            raise DaemonError(f"Serviço de busca indisponível em {self.address}: {e}") from e
+        if response.status >= 400:
+            try:
+                message = json.loads(response.read()).get("error", response.reason)
+            except ValueError:
+                message = response.reason
+            connection.close()
+            raise DaemonError(f"{response.status}: {message}")
+        return connection, response
+
+    def health(self) -> Dict:
+        connection, response = self._request("GET", "/health")
+        try:
+            return json.loads(response.read())
+        finally:
+            connection.close()
+
+    def refresh(self) -> Dict:
+        connection, response = self._request("POST", "/refresh", {})
+        try:
+            return json.loads(response.read())
+        finally:
+            connection.close()
+
+    def context(self, repo: str, file: str, line_number: int, context_lines: int = 10,
+                ref: Optional[str] = None) -> List[Tuple[int, str]]:
+        connection, response = self._request("POST", "/context", {
+            "repo": repo, "file": file, "line_number": line_number,
+            "context_lines": context_lines, "ref": ref,
+        })
+        try:
+            return [(number, text) for number, text in json.loads(response.read())["lines"]]
+        finally:
+            connection.close()
+
+    def iter_results(self, query, repos: Iterable[str] = (), groups: Iterable[str] = (),
+                     prefix: Optional[str] = None, max_results: Optional[int] = None,
+                     file_filter: Optional[Dict] = None, ref: Optional[str] = None,
+                     progress_callback=None, context_lines: int = 0) -> Iterator[Dict]:
+        self.summary = None
+        self._cancelled.clear()
+        payload = {
+            "query": query if isinstance(query, str) else list(query),
+            "repos": list(repos),
+            "groups": list(groups),
+            "prefix": prefix,
+            "max_results": max_results,
+            "filters": file_filter or {},
+            "ref": ref,
+            "context_lines": context_lines,
+            "progress": progress_callback is not None,
+        }
+        connection, response = self._request("POST", "/search", payload)
+        self._connection = connection
+        try:
+            for line in response:
+                if self._cancelled.is_set():
+                    break
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                event = item.get("event")
+                if event is None:
+                    yield item
+                elif event == "progress":
+                    if progress_callback:
+                        progress_callback(item["message"])
+                elif event == "done":
+                    self.summary = item
+                elif event == "error":
+                    raise DaemonError(item["message"])
+        except (OSError, http.client.HTTPException) as e:
+            if not self._cancelled.is_set():
+                raise DaemonError(f"Conexão com o serviço de busca interrompida: {e}") from e
+        finally:
+            self._connection = None
+            connection.close()
+        if self.summary is None and not self._cancelled.is_set() and max_results is None:
+            raise DaemonError("O serviço de busca encerrou a resposta antes do fim")
+
+    def cancel(self):
+        # Fechar o socket desbloqueia a leitura e o serviço cancela a busca ao perder o cliente
+        self._cancelled.set()
+        connection = self._connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -0,0 +1,304 @@
+import os
+import re
+import time
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+
+from blob_cache import BlobMatchCache, fan_out
+from path_filters import FileFilter, FilterStats, is_binary
+from search_engine import Query, compile_pattern, decode_text, search_text
+
+
+CLONE_MODES = ("full", "shallow", "partial", "mirror")
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+_OBJECT_ID = re.compile(r"[0-9a-f]{40}([0-9a-f]{24})?")
+
+
+class GitObjectError(Exception):
+    pass
+
+
+class GitSpawnCounter:
+    """Quantos processos git foram iniciados, por subcomando (contagem do processo inteiro)."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, args: Tuple[str, ...]):
+        # O subcomando é o primeiro argumento que não é opção global (ex: "-c chave=valor")
+        command = "?"
+        skip = False
+        for arg in args:
+            if skip:
+                skip = False
+            elif arg in ("-c", "-C"):
+                skip = True
+            elif not arg.startswith("-"):
+                command = arg
+                break
+        with self._lock:
+            self._counts[command] += 1
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self._counts)
+
+
+git_spawns = GitSpawnCounter()
+
+
+# Instalações padrão do Git for Windows, quando o git não está no PATH
+_COMMON_GIT_PATHS = (
+    r"C:\Program Files\Git\bin\git.exe",
+    r"C:\Program Files (x86)\Git\bin\git.exe",
+    r"C:\Program Files\Git\cmd\git.exe",
+)
+
+
+@lru_cache(maxsize=None)
+def _find_git() -> str:
+    found = shutil.which("git")
+    if found:
+        return found
+    for path in _COMMON_GIT_PATHS:
+        if os.path.exists(path):
+            return path
+    return "git"
+
+
+def git_executable() -> str:
+    return os.getenv("GIT_PYTHON_GIT_EXECUTABLE") or _find_git()
+
+
+def run_git(repo_path: Path, *args: str) -> bytes:
+    git_spawns.add(args)
+    proc = subprocess.run(
+        [git_executable(), "-C", str(repo_path), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        creationflags=_NO_WINDOW,
+    )
+    if proc.returncode != 0:
+        raise GitObjectError(proc.stderr.decode("utf-8", errors="ignore").strip())
+    return proc.stdout
+
+
+def _resolve(repo_path: Path, ref: str, object_type: str) -> str:
+    # Em clones normais os branches remotos só existem como origin/<branch>
+    for candidate in (ref, f"origin/{ref}"):
+        try:
+            return run_git(repo_path, "rev-parse", "--verify", "--quiet",
+                           f"{candidate}^{{{object_type}}}").decode().strip()
+        except GitObjectError:
+            continue
+    raise GitObjectError(f"Referência não encontrada: {ref}")
+
+
+def resolve_ref(repo_path: Path, ref: str) -> str:
+    return _resolve(repo_path, ref, "tree")
+
+
+def resolve_commit(repo_path: Path, ref: str) -> str:
+    return _resolve(repo_path, ref, "commit")
+
+
+def changed_paths(repo_path: Path, old_commit: str, new_commit: str) -> List[str]:
+    # Sem detecção de renomeação: o caminho antigo aparece como removido e o novo como adicionado
+    output = run_git(repo_path, "diff", "--name-only", "--no-renames", "-z", old_commit, new_commit)
+    return [str(Path(path.decode("utf-8", errors="surrogateescape")))
+            for path in output.split(b"\0") if path]
+
+
+def reachable_disk_usage(repo_path: Path) -> int:
+    # Espaço em disco dos objetos alcançáveis pelas refs do repositório, estejam eles no
+    # próprio .git/objects ou num alternate: é o que um clone independente ocuparia
+    output = run_git(repo_path, "rev-list", "--objects", "--all", "--disk-usage")
+    return int(output.strip() or 0)
+
+
+def list_tree_blobs(repo_path: Path, ref: str = "HEAD") -> List[Tuple[str, str, int]]:
+    # ls-tree aceita o hash de um commit: já resolvido, dispensa o rev-parse
+    tree = ref if _OBJECT_ID.fullmatch(ref) else resolve_ref(repo_path, ref)
+    output = run_git(repo_path, "ls-tree", "-r", "-l", "-z", "--full-tree", tree)
+    blobs = []
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, path = entry.split(b"\t", 1)
+        _, obj_type, sha, size = meta.split()
+        # Submódulos aparecem como "commit" e não têm conteúdo neste repositório
+        if obj_type != b"blob":
+            continue
+        blobs.append((path.decode("utf-8", errors="surrogateescape"), sha.decode(), int(size)))
+    return blobs
+
+
+def list_worktree_files(repo_path: Path) -> List[str]:
+    # Arquivos versionados + não versionados que o .gitignore não exclui
+    output = run_git(repo_path, "ls-files", "--cached", "--others", "--exclude-standard", "-z")
+    # Arquivos em conflito aparecem uma vez por estágio
+    paths = dict.fromkeys(output.split(b"\0"))
+    paths.pop(b"", None)
+    files = [path.decode("utf-8", errors="surrogateescape") for path in paths]
+    if os.sep != "/":
+        files = [path.replace("/", os.sep) for path in files]
+    return files
+
+
+def list_worktree_blobs(repo_path: Path) -> Dict[str, str]:
+    # Hash do blob de cada arquivo versionado cujo conteúdo na árvore de trabalho é o do índice;
+    # arquivos modificados, em conflito e não versionados ficam de fora
+    output = run_git(repo_path, "ls-files", "--stage", "-z")
+    modified = set(run_git(repo_path, "diff-files", "--name-only", "-z").split(b"\0"))
+    blobs = {}
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, path = entry.split(b"\t", 1)
+        mode, sha, stage = meta.split()
+        if mode == b"160000" or stage != b"0" or path in modified:
+            continue
+        blobs[str(Path(path.decode("utf-8", errors="surrogateescape")))] = sha.decode()
+    return blobs
+
+
+class CatFileBatch:
+    def __init__(self, repo_path: Path, check: bool = False):
+        self.repo_path = Path(repo_path)
+        self.check = check
+        self._lock = threading.Lock()
+        mode = "--batch-check" if check else "--batch"
+        git_spawns.add(("cat-file", mode))
+        self._proc = subprocess.Popen(
+            [git_executable(), "-C", str(self.repo_path), "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=_NO_WINDOW,
+        )
+
+    def read(self, sha: str) -> Optional[bytes]:
+        with self._lock:
+            self._proc.stdin.write(sha.encode() + b"\n")
+            self._proc.stdin.flush()
+            header = self._proc.stdout.readline()
+            if not header:
+                raise GitObjectError(f"git cat-file encerrou inesperadamente em {self.repo_path}")
+            parts = header.split()
+            if len(parts) != 3:
+                # "<sha> missing" ou "<sha> ambiguous"
+                return None
+            size = int(parts[2])
+            data = self._proc.stdout.read(size)
+            self._proc.stdout.read(1)
+            return data
+
+    def info(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        # Só no modo --batch-check: aceita qualquer revisão ("origin/main^{commit}", tags...)
+        with self._lock:
+            self._proc.stdin.write(rev.encode("utf-8", errors="surrogateescape") + b"\n")
+            self._proc.stdin.flush()
+            header = self._proc.stdout.readline()
+            if not header:
+                raise GitObjectError(f"git cat-file encerrou inesperadamente em {self.repo_path}")
+            parts = header.split()
+            if len(parts) != 3:
+                return None
+            return parts[0].decode(), parts[1].decode(), int(parts[2])
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_git_object_results(repo_path: Path, search_string: Query, repo_dirname: str,
+                            ref: str = "HEAD", cancel_event=None, progress_callback=None,
+                            file_filter: Optional[FileFilter] = None,
+                            stats: Optional[FilterStats] = None,
+                            only_paths: Optional[Iterable[str]] = None,
+                            blob_cache: Optional[BlobMatchCache] = None,
+                            batch: Optional[CatFileBatch] = None,
+                            context_lines: int = 0) -> Iterator[Dict]:
+    pattern = compile_pattern(search_string)
+    blobs = list_tree_blobs(repo_path, ref)
+    if only_paths is not None:
+        wanted = {Path(path).as_posix() for path in only_paths}
+        blobs = [blob for blob in blobs if blob[0] in wanted]
+    # Um processo --batch recebido de fora (GitProcessPool) continua vivo depois da busca
+    owned = batch is None
+    if owned:
+        batch = CatFileBatch(repo_path)
+    try:
+        for file_count, (path, sha, size) in enumerate(blobs, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+
+            if file_count % 100 == 0 and progress_callback:
+                progress_callback(f"Processando arquivos... ({file_count})")
+
+            if file_filter is not None:
+                reason = file_filter.skip_reason(path, size)
+                if reason is not None:
+                    if stats is not None:
+                        stats.skip(reason, size)
+                    continue
+
+            if blob_cache is not None:
+                matches = blob_cache.lookup(sha)
+                if matches is not None:
+                    if stats is not None:
+                        reason = blob_cache.skip_reason(sha)
+                        if reason is not None:
+                            stats.skip(reason, size)
+                        else:
+                            stats.reused(size)
+                    yield from fan_out(matches, repo_dirname, str(Path(path)))
+                    continue
+
+            data = batch.read(sha)
+            if data is None:
+                continue
+            if file_filter is not None and file_filter.skip_binary and is_binary(data):
+                if stats is not None:
+                    stats.skip("binário", size)
+                if blob_cache is not None:
+                    blob_cache.store(sha, [], "binário")
+                continue
+            text = decode_text(data)
+            start = time.perf_counter()
+            results = search_text(text, str(Path(path)), pattern, repo_dirname, cancel_event,
+                                  context_lines)
+            if stats is not None:
+                stats.scanned(len(data), time.perf_counter() - start)
+            if blob_cache is not None and not (cancel_event is not None and cancel_event.is_set()):
+                blob_cache.store(sha, results)
+            yield from results
+    finally:
+        if owned:
+            batch.close()
+
+
+def search_git_objects(repo_path: Path, search_string: Query, repo_dirname: str,
+                       ref: str = "HEAD", cancel_event=None, progress_callback=None,
+                       file_filter: Optional[FileFilter] = None,
+                       stats: Optional[FilterStats] = None,
+                       only_paths: Optional[Iterable[str]] = None,
+                       blob_cache: Optional[BlobMatchCache] = None,
+                       context_lines: int = 0) -> List[Dict]:
+    return list(iter_git_object_results(repo_path, search_string, repo_dirname, ref,
+                                        cancel_event, progress_callback, file_filter, stats,
+                                        only_paths, blob_cache, context_lines=context_lines))
@@ -0,0 +1,219 @@
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from git_objects import CatFileBatch, GitObjectError
+
+
+_MAX_SYMREF_DEPTH = 5
+# Nomes lidos direto do disco; qualquer outra coisa (HEAD~1, hashes, "..") vai para o git
+_PLAIN_REF = re.compile(r"(?!.*\.\.)[A-Za-z0-9_][A-Za-z0-9._/-]*")
+
+
+def git_dir_for(repo_path: Path) -> Path:
+    repo_path = Path(repo_path)
+    dot_git = repo_path / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        # Worktrees e submódulos: ".git" é um arquivo "gitdir: <caminho>"
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            git_dir = Path(content[len("gitdir:"):].strip())
+            return git_dir if git_dir.is_absolute() else repo_path / git_dir
+    # Clone bare (modo mirror)
+    return repo_path
+
+
+def _common_dir(git_dir: Path) -> Path:
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    common_dir = Path(common)
+    return common_dir if common_dir.is_absolute() else git_dir / common_dir
+
+
+def _config_value(raw: str) -> str:
+    value = []
+    quoted = False
+    i = 0
+    while i < len(raw):
+        char = raw[i]
+        if char == "\\" and i + 1 < len(raw):
+            i += 1
+            value.append({"n": "\n", "t": "\t", "b": "\b"}.get(raw[i], raw[i]))
+        elif char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        else:
+            value.append(char)
+        i += 1
+    return "".join(value).strip()
+
+
+def read_git_config(git_dir: Path) -> Dict[str, str]:
+    """Lê o ``config`` do repositório sem iniciar o git.
+
+    As chaves seguem o ``git config``: ``secao.subsecao.chave``, com seção e chave em
+    minúsculas e a subseção como está no arquivo. Vale o último valor de cada chave;
+    ``include``/``includeIf`` não são seguidos.
+    """
+    try:
+        text = (_common_dir(Path(git_dir)) / "config").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return {}
+
+    config = {}
+    section = ""
+    pending = ""
+    for line in text.splitlines():
+        # Continuação de linha com "\" no final
+        if line.endswith("\\") and not line.endswith("\\\\"):
+            pending += line[:-1]
+            continue
+        line = (pending + line).strip()
+        pending = ""
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1:line.index("]")] if "]" in line else line[1:]
+            if '"' in header:
+                name, subsection = header.split('"', 1)
+                subsection = subsection.rsplit('"', 1)[0].replace('\\"', '"').replace("\\\\", "\\")
+                section = f"{name.strip().lower()}.{subsection}"
+            else:
+                # Sintaxe antiga [secao.subsecao]
+                name, _, subsection = header.strip().partition(".")
+                section = f"{name.lower()}.{subsection}" if subsection else name.lower()
+            continue
+        key, sep, raw = line.partition("=")
+        config[f"{section}.{key.strip().lower()}"] = _config_value(raw) if sep else "true"
+    return config
+
+
+def _packed_refs(git_dir: Path) -> Dict[str, str]:
+    refs = {}
+    try:
+        with open(_common_dir(git_dir) / "packed-refs", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.strip().partition(" ")
+                if name:
+                    refs[name] = sha
+    except OSError:
+        pass
+    return refs
+
+
+def read_refs(git_dir: Path, names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Resolve refs completas (``HEAD``, ``refs/heads/x``...) lendo os arquivos do repositório.
+
+    O ``packed-refs`` é lido uma vez para todas as refs pedidas; refs simbólicas são seguidas.
+    """
+    git_dir = Path(git_dir)
+    common_dir = _common_dir(git_dir)
+    packed = None
+    resolved = {}
+    for name in names:
+        ref, sha = name, None
+        for _ in range(_MAX_SYMREF_DEPTH):
+            # HEAD é por worktree; as demais refs ficam no diretório comum
+            base = git_dir if ref == "HEAD" else common_dir
+            try:
+                content = (base / ref).read_text(encoding="utf-8").strip()
+            except OSError:
+                content = None
+            if content is None:
+                if packed is None:
+                    packed = _packed_refs(git_dir)
+                sha = packed.get(ref)
+                break
+            if content.startswith("ref:"):
+                ref = content[len("ref:"):].strip()
+                continue
+            sha = content or None
+            break
+        resolved[name] = sha
+    return resolved
+
+
+def current_branch(git_dir: Path) -> Optional[str]:
+    try:
+        head = (Path(git_dir) / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    # HEAD destacado
+    return None
+
+
+class GitProcessPool:
+    """Processos ``git cat-file`` de longa duração, reaproveitados por repositório.
+
+    Cada repositório ganha no máximo um ``--batch`` (conteúdo de blobs) e um
+    ``--batch-check`` (resolução de revisões), abertos sob demanda e mantidos até
+    ``release``/``close``. Refs simples (HEAD, branches locais e remotos) são lidas
+    direto dos arquivos e nem chegam a abrir processo.
+    """
+
+    def __init__(self):
+        self._processes: Dict[Tuple[str, bool], CatFileBatch] = {}
+        self._lock = threading.Lock()
+
+    def _process(self, repo_path: Path, check: bool) -> CatFileBatch:
+        key = (str(Path(repo_path).resolve()), check)
+        with self._lock:
+            process = self._processes.get(key)
+            if process is None:
+                process = self._processes[key] = CatFileBatch(repo_path, check=check)
+            return process
+
+    def batch(self, repo_path: Path) -> CatFileBatch:
+        return self._process(repo_path, check=False)
+
+    def batch_check(self, repo_path: Path) -> CatFileBatch:
+        return self._process(repo_path, check=True)
+
+    def resolve_commit(self, repo_path: Path, ref: str) -> str:
+        # Mesma regra do rev-parse usado antes: em clones normais os branches remotos
+        # só existem como origin/<branch>
+        candidates = (ref, f"origin/{ref}")
+        git_dir = git_dir_for(repo_path)
+        for candidate in candidates:
+            if not _PLAIN_REF.fullmatch(candidate):
+                break
+            if candidate == "HEAD" or candidate.startswith("refs/"):
+                names = [candidate]
+            elif read_refs(git_dir, [f"refs/tags/{candidate}"])[f"refs/tags/{candidate}"]:
+                # Tags podem ser anotadas (apontam para um objeto tag): o git resolve
+                break
+            else:
+                names = [f"refs/heads/{candidate}", f"refs/remotes/{candidate}"]
+            for sha in read_refs(git_dir, names).values():
+                if sha:
+                    return sha
+        for candidate in candidates:
+            info = self.batch_check(repo_path).info(f"{candidate}^{{commit}}")
+            if info is not None:
+                return info[0]
+        raise GitObjectError(f"Referência não encontrada: {ref}")
+
+    def release(self, repo_path: Path):
+        path = str(Path(repo_path).resolve())
+        with self._lock:
+            keys = [key for key in self._processes if key[0] == path]
+            processes = [self._processes.pop(key) for key in keys]
+        for process in processes:
+            process.close()
+
+    def close(self):
+        with self._lock:
+            processes = list(self._processes.values())
+            self._processes.clear()
+        for process in processes:
+            process.close()
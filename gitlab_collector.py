@@ -1,47 +1,184 @@
+import os
+import json
+import time
+import hashlib
+import threading
 import gitlab
-from typing import List, Optional
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+
+# Versão do formato em disco: entradas de outra versão são descartadas
+CACHE_VERSION = 2
+PER_PAGE = 100
+
+
+class ListingCache:
+    def __init__(self, cache_dir: Path, base_url: str, token: str, ttl: float):
+        # O token entra na chave (como hash) porque cada usuário enxerga grupos diferentes
+        key = hashlib.sha256(f"{base_url.rstrip('/')}\0{token}".encode()).hexdigest()[:16]
+        self.cache_file = Path(cache_dir) / f"{key}.json"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _save(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self._entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def put(self, key: str, pages: List[Dict]):
+        # Cada página guarda o próprio ETag: {"etag": ..., "items": [...]}
+        with self._lock:
+            self._entries[key] = {"fetched_at": time.time(), "pages": pages}
+            self._save()
+
 
 class GitLabCollector:
-    def __init__(self, token: str, base_url: str = "https://gitlab.nelogica.com.br/"):
-        self.gl = gitlab.Gitlab(base_url, private_token=token)
+    def __init__(self, token: str, base_url: str = "https://gitlab.nelogica.com.br/",
+                 max_workers: int = 8, session: Optional[requests.Session] = None,
+                 cache_dir: Optional[Path] = Path(".cache") / "gitlab", cache_ttl: float = 600):
+        self.max_workers = max(1, max_workers)
+        if session is None:
+            # Uma sessão compartilhada por todas as threads, com conexões suficientes para o pool
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.gl = gitlab.Gitlab(base_url, private_token=token, session=session)
         self.base_url = base_url
+        self.cache = ListingCache(cache_dir, base_url, token, cache_ttl) if cache_dir else None
+        self._cancel_flag = threading.Event()
 
-    def list_groups(self) -> List[dict]:
-        groups = self.gl.groups.list(all=True, order_by="name", sort="asc")
-        return [
-            {
-                "id": group.id,
-                "name": group.name,
-                "path": group.path,
-                "full_path": group.full_path
-            }
-            for group in groups
-        ]
+    def cancel(self):
+        # Requisições em andamento terminam; páginas e grupos seguintes não são pedidos
+        self._cancel_flag.set()
+
+    def _fetch_pages(self, path: str, query_data: dict, project: Callable[[dict], dict],
+                     cached_pages: List[Dict] = ()) -> Optional[List[Dict]]:
+        # Cada página é revalidada com o próprio ETag (304 reaproveita os itens em cache).
+        # A ordem da listagem é fixa: um item novo desloca as páginas seguintes, então só
+        # a página onde ele entrou e as posteriores voltam com conteúdo
+        pages = []
+        page = 1
+        while page:
+            if self._cancel_flag.is_set():
+                return None
+            cached = cached_pages[page - 1] if page <= len(cached_pages) else None
+            headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else None
+            try:
+                response = self.gl.http_request("get", path,
+                                                query_data={**query_data, "page": page},
+                                                extra_headers=headers)
+            except gitlab.exceptions.GitlabHttpError as e:
+                if e.response_code != 304:
+                    raise
+                pages.append(cached)
+                # Sem X-Next-Page no 304: segue as páginas em cache e, se a última estava
+                # cheia, confere a seguinte (um item novo no fim da ordem cai nela)
+                last = page >= len(cached_pages)
+                page = page + 1 if not last or len(cached["items"]) >= PER_PAGE else None
+                continue
+
+            # Só os campos usados vão para o disco
+            pages.append({"etag": response.headers.get("ETag"),
+                          "items": [project(item) for item in response.json()]})
+            next_page = response.headers.get("X-Next-Page")
+            page = int(next_page) if next_page else None
+        return pages
+
+    def _cached_listing(self, key: str, path: str, query_data: dict,
+                        project: Callable[[dict], dict], refresh: bool) -> List[dict]:
+        query_data = {**query_data, "per_page": PER_PAGE}
+        entry = self.cache.get(key) if self.cache is not None else None
+        if entry and not refresh and self.cache.is_fresh(entry):
+            return [item for page in entry["pages"] for item in page["items"]]
+
+        cached_pages = entry["pages"] if entry and not refresh else []
+        pages = self._fetch_pages(path, query_data, project, cached_pages)
+        if pages is None:
+            # Cancelada no meio: uma listagem parcial não vai para o cache
+            return []
+        if self.cache is not None:
+            self.cache.put(key, pages)
+        return [item for page in pages for item in page["items"]]
+
+    def list_groups(self, refresh: bool = False) -> List[dict]:
+        self._cancel_flag.clear()
+        return self._cached_listing(
+            "groups", "/groups",
+            {"order_by": "name", "sort": "asc"},
+            lambda group: {
+                "id": group["id"],
+                "name": group["name"],
+                "path": group["path"],
+                "full_path": group["full_path"]
+            },
+            refresh,
+        )
+
+    def get_group_repositories(self, group_path: str, prefix_filter: Optional[str] = None,
+                               refresh: bool = False) -> List[str]:
+        self._cancel_flag.clear()
+        return self._group_repositories(group_path, prefix_filter, refresh)
 
-    def get_group_repositories(self, group_path: str, prefix_filter: Optional[str] = None) -> List[str]:
-        group = self.gl.groups.get(group_path)
-        projects = group.projects.list(
-            include_subgroups=True,
-            archived=False,
-            with_shared=False,
-            all=True,
+    def _group_repositories(self, group_path: str, prefix_filter: Optional[str],
+                            refresh: bool) -> List[str]:
+        projects = self._cached_listing(
+            f"projects:{group_path}", f"/groups/{quote(group_path, safe='')}/projects",
+            {"include_subgroups": "true", "archived": "false", "with_shared": "false"},
+            lambda project: {
+                "path_with_namespace": project["path_with_namespace"],
+                "forked": bool(project.get("forked_from_project")),
+            },
+            refresh,
         )
         repo_list = [
-            p.path_with_namespace
+            p["path_with_namespace"]
             for p in projects
-            if not getattr(p, "forked_from_project", None)
+            if not p["forked"]
         ]
         if prefix_filter:
             repo_list = [r for r in repo_list if r.startswith(prefix_filter)]
         return repo_list
 
-    def get_multiple_groups_repositories(self, group_paths: List[str]) -> List[str]:
+    def get_multiple_groups_repositories(self, group_paths: List[str],
+                                         refresh: bool = False,
+                                         prefix_filter: Optional[str] = None) -> List[str]:
+        self._cancel_flag.clear()
         all_repos = []
         seen = set()
-        for group_path in group_paths:
-            repos = self.get_group_repositories(group_path)
-            for repo in repos:
-                if repo not in seen:
-                    seen.add(repo)
-                    all_repos.append(repo)
-        return all_repos
\ No newline at end of file
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="gitlab-groups") as pool:
+            # map preserva a ordem dos grupos, então a deduplicação continua determinística
+            repo_lists = pool.map(lambda group_path: self._group_repositories(
+                group_path, prefix_filter, refresh), group_paths)
+            for repos in repo_lists:
+                for repo in repos:
+                    if repo not in seen:
+                        seen.add(repo)
+                        all_repos.append(repo)
+        return all_repos
@@ -6,10 +6,16 @@ import sys
 from pathlib import Path
 from dotenv import load_dotenv
 import threading
+import multiprocessing
+from functools import partial
 
 try:
-    from repo_searcher import RepoSearcher
+    from repo_searcher import RepoSearcher, shared_store_summary
     from gitlab_collector import GitLabCollector
+    from path_filters import DEFAULT_EXCLUDES, DEFAULT_MAX_FILE_SIZE, FileFilter, parse_globs
+    from result_set import ResultSet
+    from result_sink import JsonlSink
+    from daemon_client import DaemonClient
 except ImportError as e:
     if "git" in str(e).lower() or "Bad git executable" in str(e):
         messagebox.showerror(
@@ -25,6 +31,12 @@ except ImportError as e:
 
 load_dotenv()
 
+RESULTS_PAGE_SIZE = 500
+FLUSH_INTERVAL_MS = 100
+# Linhas antes e depois do resultado na janela de detalhes, lidas só quando ela abre
+DETAIL_CONTEXT_LINES = 10
+
+
 class RepoSearchGUI:
     def __init__(self, root):
         self.root = root
@@ -33,8 +45,16 @@ class RepoSearchGUI:
         self.root.minsize(900, 700)
         
         self.searcher = None
+        self.daemon_client = None
         self.search_thread = None
-        self.results = []
+        self.results = ResultSet()
+        self.page = 0
+        # Resultados e progresso chegam das threads de busca e são aplicados em lote pelo timer
+        self._pending_lock = threading.Lock()
+        self._pending_results = []
+        self._pending_progress = None
+        self._flush_job = None
+        self._search_generation = 0
         self.groups = []
         self.selected_groups = []
         self.gitlab_collector = None
@@ -87,8 +107,18 @@ class RepoSearchGUI:
         button_frame.grid(row=1, column=2, pady=(10, 0))
         ttk.Button(button_frame, text="Carregar Grupos", 
                   command=self.load_groups).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Atualizar Grupos", 
+                  command=lambda: self.load_groups(refresh=True)).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="Carregar .env", 
                   command=self.load_env).pack(side=tk.LEFT)
+
+        # Vazio: busca local; preenchido: a busca vai para o search_daemon
+        self.daemon_var = tk.StringVar(value=os.getenv("REPO_SEARCH_DAEMON", ""))
+        ttk.Label(config_frame, text="Serviço de busca:").grid(row=2, column=0, sticky=tk.W, padx=(0, 10), pady=(10, 0))
+        ttk.Entry(config_frame, textvariable=self.daemon_var, width=50).grid(
+            row=2, column=1, sticky=(tk.W, tk.E), padx=(0, 10), pady=(10, 0))
+        ttk.Label(config_frame, text="(ex: http://127.0.0.1:8765; vazio = busca local)",
+                 foreground="gray").grid(row=2, column=2, sticky=tk.W, pady=(10, 0))
         
         groups_frame = ttk.LabelFrame(main_frame, text="Grupos do GitLab", padding="10")
         groups_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
@@ -144,12 +174,52 @@ class RepoSearchGUI:
                                        command=self.cancel_search, state="disabled", width=15)
         self.cancel_button.pack(side=tk.LEFT)
         
+        self.use_index_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Usar índice de trigramas (buscas repetidas mais rápidas)",
+                       variable=self.use_index_var).grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Incremental (reler só arquivos alterados desde a última busca)",
+                       variable=self.incremental_var).grid(row=1, column=2, sticky=tk.W, pady=(5, 0))
+        
+        filters_frame = ttk.Frame(search_frame)
+        filters_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        filters_frame.columnconfigure(1, weight=1)
+        filters_frame.columnconfigure(3, weight=1)
+        
+        ttk.Label(filters_frame, text="Incluir:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        self.include_var = tk.StringVar()
+        ttk.Entry(filters_frame, textvariable=self.include_var).grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
+        
+        ttk.Label(filters_frame, text="Excluir:").grid(row=0, column=2, sticky=tk.W, padx=(0, 5))
+        self.exclude_var = tk.StringVar(value=", ".join(DEFAULT_EXCLUDES))
+        ttk.Entry(filters_frame, textvariable=self.exclude_var).grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(0, 10))
+        
+        ttk.Label(filters_frame, text="Tamanho máx. (MB):").grid(row=0, column=4, sticky=tk.W, padx=(0, 5))
+        self.max_size_var = tk.StringVar(value=str(DEFAULT_MAX_FILE_SIZE // (1024 * 1024)))
+        ttk.Entry(filters_frame, textvariable=self.max_size_var, width=6).grid(row=0, column=5, sticky=tk.W)
+        
+        self.skip_binary_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filters_frame, text="Ignorar binários",
+                       variable=self.skip_binary_var).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        self.use_gitignore_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filters_frame, text="Respeitar .gitignore",
+                       variable=self.use_gitignore_var).grid(row=1, column=2, columnspan=2, sticky=tk.W, pady=(5, 0))
+        self.multi_term_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters_frame, text="Vários termos (separados por ;)",
+                       variable=self.multi_term_var).grid(row=1, column=4, columnspan=2, sticky=tk.W, pady=(5, 0))
+        self.shared_objects_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters_frame, text="Objetos git compartilhados por grupo (clones novos baixam só o que falta)",
+                       variable=self.shared_objects_var).grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+        self.dedup_blobs_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters_frame, text="Ler conteúdo repetido uma vez só",
+                       variable=self.dedup_blobs_var).grid(row=2, column=4, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
         self.progress_var = tk.StringVar(value="Pronto")
         self.progress_label = ttk.Label(search_frame, textvariable=self.progress_var)
-        self.progress_label.grid(row=1, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
+        self.progress_label.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
         
         self.progress_bar = ttk.Progressbar(search_frame, mode='indeterminate')
-        self.progress_bar.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.progress_bar.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
         
         results_frame = ttk.LabelFrame(main_frame, text="Resultados", padding="10")
         results_frame.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
@@ -179,8 +249,28 @@ class RepoSearchGUI:
         
         self.results_tree.bind("<Double-1>", self.show_result_details)
         
+        pager_frame = ttk.Frame(results_frame)
+        pager_frame.grid(row=1, column=0, columnspan=2, pady=(5, 0))
+        
+        self.first_page_button = ttk.Button(pager_frame, text="⏮", width=3,
+                                            command=lambda: self.go_to_page(0))
+        self.first_page_button.pack(side=tk.LEFT)
+        self.prev_page_button = ttk.Button(pager_frame, text="◀", width=3,
+                                           command=lambda: self.go_to_page(self.page - 1))
+        self.prev_page_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.page_var = tk.StringVar()
+        ttk.Label(pager_frame, textvariable=self.page_var, width=30,
+                 anchor=tk.CENTER).pack(side=tk.LEFT, padx=5)
+        self.next_page_button = ttk.Button(pager_frame, text="▶", width=3,
+                                           command=lambda: self.go_to_page(self.page + 1))
+        self.next_page_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.last_page_button = ttk.Button(pager_frame, text="⏭", width=3,
+                                           command=lambda: self.go_to_page(self.page_count() - 1))
+        self.last_page_button.pack(side=tk.LEFT)
+        self._update_pager()
+        
         action_frame = ttk.Frame(results_frame)
-        action_frame.grid(row=1, column=0, columnspan=2, pady=(10, 0))
+        action_frame.grid(row=2, column=0, columnspan=2, pady=(10, 0))
         
         ttk.Button(action_frame, text="💾 Salvar JSON", 
                   command=self.save_results).pack(side=tk.LEFT, padx=(0, 5))
@@ -207,7 +297,7 @@ class RepoSearchGUI:
         if url:
             self.gitlab_url_var.set(url)
     
-    def load_groups(self):
+    def load_groups(self, refresh=False):
         token = self.token_var.get().strip()
         if not token:
             messagebox.showerror("Erro", "Por favor, informe o GitLab Token!")
@@ -221,7 +311,7 @@ class RepoSearchGUI:
         try:
             self.progress_var.set("Carregando grupos...")
             self.gitlab_collector = GitLabCollector(token, url)
-            self.groups = self.gitlab_collector.list_groups()
+            self.groups = self.gitlab_collector.list_groups(refresh=refresh)
             
             self.groups_listbox.delete(0, tk.END)
             for group in self.groups:
@@ -254,13 +344,16 @@ class RepoSearchGUI:
                     config = json.load(f)
                     if "selected_groups" in config:
                         self.selected_groups = config["selected_groups"]
+                    if config.get("daemon_url"):
+                        self.daemon_var.set(config["daemon_url"])
             except Exception as e:
                 print(f"Erro ao carregar configuração: {e}")
     
     def save_config(self):
         config = {
             "selected_groups": self.selected_groups,
-            "gitlab_url": self.gitlab_url_var.get()
+            "gitlab_url": self.gitlab_url_var.get(),
+            "daemon_url": self.daemon_var.get().strip()
         }
         config_file = Path("config.json")
         try:
@@ -271,7 +364,8 @@ class RepoSearchGUI:
     
     def validate_inputs(self):
         token = self.token_var.get().strip()
-        if not token:
+        # Com o serviço de busca, o token usado é o dele
+        if not token and not self.daemon_var.get().strip():
             messagebox.showerror("Erro", "Por favor, informe o GitLab Token!")
             return False
         
@@ -280,35 +374,124 @@ class RepoSearchGUI:
             return False
         
         search_string = self.search_var.get().strip()
+        if self.multi_term_var.get():
+            search_string = search_string.replace(";", "").strip()
         if not search_string:
             messagebox.showerror("Erro", "Por favor, informe o termo de busca!")
             return False
         
         return True
     
-    def progress_callback(self, message):
-        self.root.after(0, lambda: self.progress_var.set(message))
-        self.root.after(0, lambda: self.status_var.set(message))
+    def progress_callback(self, message, generation=None):
+        # Só a mensagem mais recente interessa; o timer de _flush_pending a exibe
+        with self._pending_lock:
+            if generation is None or generation == self._search_generation:
+                self._pending_progress = message
+    
+    def result_callback(self, result, generation=None):
+        # Uma busca cancelada que ainda está drenando não mistura resultados com a nova
+        with self._pending_lock:
+            if generation is None or generation == self._search_generation:
+                self._pending_results.append(result)
+    
+    def _next_generation(self):
+        with self._pending_lock:
+            self._search_generation += 1
+            return self._search_generation
+    
+    def _start_flushing(self):
+        self._stop_flushing()
+        self._flush_job = self.root.after(FLUSH_INTERVAL_MS, self._flush_loop)
+    
+    def _flush_loop(self):
+        self._flush_pending()
+        self._flush_job = self.root.after(FLUSH_INTERVAL_MS, self._flush_loop)
+    
+    def _stop_flushing(self):
+        if self._flush_job is not None:
+            self.root.after_cancel(self._flush_job)
+            self._flush_job = None
+        self._flush_pending()
+    
+    def _flush_pending(self):
+        with self._pending_lock:
+            results, self._pending_results = self._pending_results, []
+            message, self._pending_progress = self._pending_progress, None
+        
+        if message is not None:
+            self.progress_var.set(message)
+            self.status_var.set(message)
+        if results:
+            first_new = len(self.results)
+            self.results.extend(results)
+            # Só as linhas que caem na página visível viram itens da Treeview
+            page_end = (self.page + 1) * RESULTS_PAGE_SIZE
+            for row in range(max(first_new, self.page * RESULTS_PAGE_SIZE),
+                             min(len(self.results), page_end)):
+                self._insert_row(row)
+            self._update_pager()
+            self.status_var.set(f"{len(self.results)} resultado(s) encontrado(s)")
+    
+    def _insert_row(self, row):
+        result = self.results[row]
+        preview = result["line"][:80] + "..." if len(result["line"]) > 80 else result["line"]
+        if "term" in result:
+            preview = f"[{result['term']}] {preview}"
+        self.results_tree.insert("", tk.END, iid=str(row),
+                                 text=str(row + 1),
+                                 values=(
+                                     result["repo"],
+                                     result["file"],
+                                     result["line_number"],
+                                     preview
+                                 ))
+    
+    def page_count(self):
+        return max(1, -(-len(self.results) // RESULTS_PAGE_SIZE))
+    
+    def go_to_page(self, page):
+        self.page = min(max(page, 0), self.page_count() - 1)
+        self.results_tree.delete(*self.results_tree.get_children())
+        start = self.page * RESULTS_PAGE_SIZE
+        for row in range(start, min(len(self.results), start + RESULTS_PAGE_SIZE)):
+            self._insert_row(row)
+        self._update_pager()
     
-    def result_callback(self, result):
-        self.root.after(0, lambda r=result: self.add_result(r))
+    def _update_pager(self):
+        pages = self.page_count()
+        start = self.page * RESULTS_PAGE_SIZE
+        end = min(len(self.results), start + RESULTS_PAGE_SIZE)
+        self.page_var.set(f"Página {self.page + 1} de {pages} "
+                          f"({start + 1 if end else 0}–{end} de {len(self.results)})")
+        for button, enabled in ((self.first_page_button, self.page > 0),
+                                (self.prev_page_button, self.page > 0),
+                                (self.next_page_button, self.page < pages - 1),
+                                (self.last_page_button, self.page < pages - 1)):
+            button.config(state="normal" if enabled else "disabled")
     
-    def add_result(self, result):
-        item_id = self.results_tree.insert("", tk.END, 
-                                          text=str(len(self.results) + 1),
-                                          values=(
-                                              result["repo"],
-                                              result["file"],
-                                              result["line_number"],
-                                              result["line"][:80] + "..." if len(result["line"]) > 80 else result["line"]
-                                          ))
-        self.results.append(result)
-        self.status_var.set(f"{len(self.results)} resultado(s) encontrado(s)")
+    def build_file_filter(self):
+        max_size = self.max_size_var.get().strip()
+        try:
+            max_file_size = int(float(max_size) * 1024 * 1024) if max_size else None
+        except ValueError:
+            messagebox.showerror("Erro", "Tamanho máximo inválido! Informe um número em MB.")
+            return None
+        return FileFilter(
+            include=parse_globs(self.include_var.get()),
+            exclude=parse_globs(self.exclude_var.get()),
+            max_file_size=max_file_size,
+            skip_binary=self.skip_binary_var.get(),
+            use_gitignore=self.use_gitignore_var.get(),
+        )
     
     def start_search(self):
         if not self.validate_inputs():
             return
 
+        file_filter = self.build_file_filter()
+        if file_filter is None:
+            return
+
         self.clear_results()
 
         self.search_button.config(state="disabled")
@@ -316,57 +499,116 @@ class RepoSearchGUI:
 
         self.progress_bar.start()
         self.progress_var.set("Iniciando busca...")
+        generation = self._next_generation()
+        self._start_flushing()
 
         token = self.token_var.get().strip()
         url = self.gitlab_url_var.get().strip()
         search_string = self.search_var.get().strip()
+        if self.multi_term_var.get():
+            search_string = [term.strip() for term in search_string.split(";") if term.strip()]
 
-        if not self.gitlab_collector:
+        if not self.gitlab_collector and not self.daemon_var.get().strip():
             self.gitlab_collector = GitLabCollector(token, url)
 
         self.search_thread = threading.Thread(
             target=self._search_thread,
-            args=(search_string,),
+            args=(search_string, file_filter, generation),
             daemon=True
         )
         self.search_thread.start()
     
-    def _search_thread(self, search_string):
+    def _search_thread(self, search_string, file_filter, generation):
+        daemon_url = self.daemon_var.get().strip()
+        if daemon_url:
+            self._daemon_search_thread(daemon_url, search_string, file_filter, generation)
+            return
+        self.daemon_client = None
+        progress_callback = partial(self.progress_callback, generation=generation)
         try:
-            self.progress_callback("Buscando repositórios nos grupos selecionados...")
+            progress_callback("Buscando repositórios nos grupos selecionados...")
             repos = self.gitlab_collector.get_multiple_groups_repositories(self.selected_groups)
+            if generation != self._search_generation:
+                # Cancelada durante a listagem: nada de clonar a lista parcial
+                return
             
             if not repos:
                 self.root.after(0, lambda: messagebox.showwarning("Aviso", "Nenhum repositório encontrado nos grupos selecionados!"))
-                self.root.after(0, self._search_complete, [])
+                self.root.after(0, self._search_complete, 0, generation)
                 return
             
-            self.progress_callback(f"Encontrados {len(repos)} repositórios. Iniciando busca...")
+            progress_callback(f"Encontrados {len(repos)} repositórios. Iniciando busca...")
             
             token = self.token_var.get().strip()
             url = self.gitlab_url_var.get().strip()
-            self.searcher = RepoSearcher(token=token, gitlab_url=url)
+            self.searcher = RepoSearcher(token=token, gitlab_url=url,
+                                         use_index=self.use_index_var.get(),
+                                         incremental=self.incremental_var.get(),
+                                         shared_objects=self.shared_objects_var.get(),
+                                         dedup_blobs=self.dedup_blobs_var.get(),
+                                         file_filter=file_filter)
             
-            results = self.searcher.search_repos(
-                repos,
-                search_string,
-                progress_callback=self.progress_callback,
-                result_callback=self.result_callback
-            )
+            # Os resultados ficam só em self.results (add_result); sem uma segunda cópia aqui
+            found = 0
+            for result in self.searcher.iter_results(repos, search_string,
+                                                     progress_callback=progress_callback):
+                self.result_callback(result, generation)
+                found += 1
+
+            if self.searcher.shared_objects:
+                for entry in self.searcher.shared_store_report():
+                    progress_callback(f"📦 {shared_store_summary(entry)}")
+            self.root.after(0, self._search_complete, found, generation)
+        except Exception as e:
+            self.root.after(0, self._search_error, str(e), generation)
 
-            self.root.after(0, self._search_complete, results)
+    def _daemon_search_thread(self, daemon_url, search_string, file_filter, generation):
+        # Cliente fino: grupos, clones e caches ficam no serviço, já aquecidos
+        self.searcher = None
+        self.daemon_client = client = DaemonClient(daemon_url)
+        filters = {
+            "include": file_filter.include,
+            "exclude": file_filter.exclude,
+            "max_file_size": file_filter.max_file_size,
+            "skip_binary": file_filter.skip_binary,
+            "use_gitignore": file_filter.use_gitignore,
+        }
+        progress_callback = partial(self.progress_callback, generation=generation)
+        try:
+            progress_callback(f"Buscando via {daemon_url}...")
+            found = 0
+            for result in client.iter_results(search_string, groups=self.selected_groups,
+                                              file_filter=filters,
+                                              progress_callback=progress_callback):
+                self.result_callback(result, generation)
+                found += 1
+            # Cancelada: o cliente sai do laço sem resumo e cancel_search já atualizou a tela
+            if client.summary is not None:
+                self.root.after(0, self._search_complete, found, generation)
         except Exception as e:
-            self.root.after(0, lambda: self._search_error(str(e)))
+            self.root.after(0, self._search_error, str(e), generation)
     
-    def _search_complete(self, results):
+    def _search_complete(self, found, generation):
+        # A busca terminou depois de cancelada (talvez já com outra em andamento)
+        if generation != self._search_generation:
+            return
+        self._stop_flushing()
         self.progress_bar.stop()
-        self.progress_var.set(f"Busca concluída! {len(results)} resultado(s) encontrado(s)")
-        self.status_var.set(f"Busca concluída! {len(results)} resultado(s) encontrado(s)")
+        self.progress_var.set(f"Busca concluída! {found} resultado(s) encontrado(s)")
+        status = f"Busca concluída! {found} resultado(s) encontrado(s)"
+        if self.searcher and self.searcher.filter_stats.files_skipped:
+            status += f" — {self.searcher.filter_stats.summary()}"
+        elif self.daemon_client and self.daemon_client.summary and self.daemon_client.summary["summary"]:
+            status += f" — {self.daemon_client.summary['summary']}"
+        self.status_var.set(status)
         self.search_button.config(state="normal")
         self.cancel_button.config(state="disabled")
         self.save_config()
     
-    def _search_error(self, error_msg):
+    def _search_error(self, error_msg, generation):
+        if generation != self._search_generation:
+            return
+        self._stop_flushing()
         self.progress_bar.stop()
         self.progress_var.set("Erro na busca")
         self.status_var.set(f"Erro: {error_msg}")
@@ -375,8 +617,14 @@ class RepoSearchGUI:
         messagebox.showerror("Erro", f"Erro durante a busca:\n{error_msg}")
     
     def cancel_search(self):
+        if self.gitlab_collector:
+            self.gitlab_collector.cancel()
         if self.searcher:
             self.searcher.cancel()
+        if self.daemon_client:
+            self.daemon_client.cancel()
+        self._next_generation()
+        self._stop_flushing()
         self.progress_bar.stop()
         self.progress_var.set("Busca cancelada")
         self.status_var.set("Busca cancelada pelo usuário")
@@ -384,8 +632,10 @@ class RepoSearchGUI:
         self.cancel_button.config(state="disabled")
     
     def clear_results(self):
-        self.results_tree.delete(*self.results_tree.get_children())
-        self.results = []
+        with self._pending_lock:
+            self._pending_results = []
+        self.results.clear()
+        self.go_to_page(0)
         self.status_var.set("Resultados limpos")
     
     def show_result_details(self, event):
@@ -424,32 +674,34 @@ class RepoSearchGUI:
             code_text.pack(fill=tk.BOTH, expand=True)
 
             try:
-                repo_name_clean = result["repo"].replace("/", "_")
-                repo_path = Path("repos_temp") / repo_name_clean
-                file_path = repo_path / result["file"]
-                
-                if file_path.exists():
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        lines = f.readlines()
+                line_num = result["line_number"]
+                if self.daemon_client is not None:
+                    # Os clones da busca ficam no serviço
+                    lines = self.daemon_client.context(result["repo"], result["file"], line_num,
+                                                       DETAIL_CONTEXT_LINES)
+                else:
+                    lines = self._context_searcher().get_context(
+                        result["repo"], result["file"], line_num, DETAIL_CONTEXT_LINES)
 
-                    line_num = result["line_number"]
-                    start = max(0, line_num - 10)
-                    end = min(len(lines), line_num + 10)
-                    
-                    for i in range(start, end):
-                        prefix = ">>> " if i + 1 == line_num else "    "
-                        code_text.insert(tk.END, f"{prefix}{i+1:4d} | {lines[i]}")
-
-                    code_text.tag_add("highlight", 
-                                    f"{line_num - start + 1}.0", 
-                                    f"{line_num - start + 1}.end")
-                    code_text.tag_config("highlight", background="yellow")
+                for row, (number, text) in enumerate(lines, start=1):
+                    prefix = ">>> " if number == line_num else "    "
+                    code_text.insert(tk.END, f"{prefix}{number:4d} | {text}\n")
+                    if number == line_num:
+                        code_text.tag_add("highlight", f"{row}.0", f"{row}.end")
+                code_text.tag_config("highlight", background="yellow")
             except Exception as e:
                 code_text.insert(tk.END, f"Erro ao ler arquivo: {e}\n\n")
                 code_text.insert(tk.END, f"Linha encontrada:\n{result['line']}")
             
             code_text.config(state="disabled")
     
+    def _context_searcher(self):
+        # Lê só o trecho, do clone e da ref da última busca
+        if self.searcher is None:
+            self.searcher = RepoSearcher(token=self.token_var.get().strip(),
+                                         gitlab_url=self.gitlab_url_var.get().strip())
+        return self.searcher
+
     def copy_selected(self):
         selection = self.results_tree.selection()
         if not selection:
@@ -477,19 +729,25 @@ class RepoSearchGUI:
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("JSON Lines", "*.jsonl"),
+                       ("JSON Lines (gzip)", "*.jsonl.gz"), ("All files", "*.*")]
         )
         
         if filename:
             try:
-                with open(filename, "w", encoding="utf-8") as f:
-                    json.dump(self.results, f, indent=2, ensure_ascii=False)
+                if filename.endswith((".jsonl", ".jsonl.gz")):
+                    with JsonlSink(filename) as sink:
+                        sink.write_all(self.results)
+                else:
+                    with open(filename, "w", encoding="utf-8") as f:
+                        self.results.write_json(f)
                 messagebox.showinfo("Sucesso", f"Resultados salvos em {filename}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar arquivo:\n{e}")
 
 
 def main():
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = RepoSearchGUI(root)
     root.mainloop()
@@ -0,0 +1,80 @@
+import re
+import mmap
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+CHUNK_SIZE = 1024 * 1024
+
+# Mesmas quebras da busca (decode_text / modo texto): "\r\n", "\r" sozinho e "\n"
+_LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+
+class LineIndex:
+    """Onde começam as linhas de um conteúdo, para ler um trecho sem carregar o arquivo.
+
+    Guarda um ponto de partida (número da linha, deslocamento em bytes) a cada
+    ``chunk_size`` bytes: montar o índice só conta quebras de linha bloco a bloco, e
+    chegar a uma linha percorre no máximo um bloco. O índice não prende o arquivo;
+    cada leitura recebe o conteúdo (``bytes`` ou ``mmap``) de novo.
+    """
+
+    def __init__(self, buffer, chunk_size: int = CHUNK_SIZE):
+        self.size = len(buffer)
+        self.line_numbers = [1]
+        self.offsets = [0]
+        lines = 1
+        start = 0
+        while start < self.size:
+            end = min(start + chunk_size, self.size)
+            if buffer[end - 1:end] == b"\r" and buffer[end:end + 1] == b"\n":
+                # Um "\r\n" não fica dividido entre dois blocos
+                end += 1
+            chunk = buffer[start:end]
+            count = chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+            if count:
+                lines += count
+                self.line_numbers.append(lines)
+                self.offsets.append(start + max(chunk.rfind(b"\n"), chunk.rfind(b"\r")) + 1)
+            start = end
+        self.line_count = lines
+
+    def line_start(self, buffer, line_number: int) -> Optional[int]:
+        i = bisect_right(self.line_numbers, line_number) - 1
+        pos = self.offsets[i]
+        for _ in range(line_number - self.line_numbers[i]):
+            line_break = _LINE_BREAK.search(buffer, pos)
+            if line_break is None:
+                return None
+            pos = line_break.end()
+        return pos
+
+    def lines(self, buffer, first: int, last: int) -> List[Tuple[int, str]]:
+        # Mesma decodificação da busca (utf-8 ignorando erros)
+        first = max(1, first)
+        pos = self.line_start(buffer, first)
+        lines = []
+        line_number = first
+        while pos is not None and pos < self.size and line_number <= last:
+            line_break = _LINE_BREAK.search(buffer, pos)
+            stop = self.size if line_break is None else line_break.start()
+            lines.append((line_number, bytes(buffer[pos:stop]).decode("utf-8", errors="ignore")))
+            if line_break is None:
+                break
+            pos = line_break.end()
+            line_number += 1
+        return lines
+
+
+def read_file_lines(file_path: Path, first: int, last: int,
+                    index: Optional[LineIndex] = None) -> Tuple[List[Tuple[int, str]], Optional[LineIndex]]:
+    """Linhas ``first``..``last`` de um arquivo via mmap; devolve também o índice (para cache)."""
+    with open(file_path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return [], None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if index is None or index.size != size:
+                index = LineIndex(mapped)
+            return index.lines(mapped, first, last), index
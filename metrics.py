@@ -0,0 +1,96 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from path_filters import format_size
+
+
+# (fase, campo, título, formato) das colunas da tabela de resumo
+SUMMARY_COLUMNS = (
+    ("fetch", "seconds", "fetch (s)", "{:.2f}"),
+    ("fetch", "bytes", "baixado", "size"),
+    ("list_files", "seconds", "listar (s)", "{:.2f}"),
+    ("search", "files_scanned", "lidos", "{:d}"),
+    ("search", "files_skipped", "ignorados", "{:d}"),
+    ("search", "bytes_scanned", "bytes lidos", "size"),
+    ("search", "bytes_reused", "reaproveitados", "size"),
+    ("search", "seconds", "busca (s)", "{:.2f}"),
+    ("search", "match_seconds", "regex (s)", "{:.2f}"),
+    ("search", "matches", "resultados", "{:d}"),
+)
+
+
+class SearchMetrics:
+    """Eventos de tempo e volume por repositório e por fase de uma busca.
+
+    Cada chamada de ``record`` gera um dict (``{"event": fase, "repo": ..., ...}``)
+    guardado em ``events`` e repassado ao ``hook``, se houver (um ``JsonlSink``
+    serve). Os campos numéricos também são somados por repositório e fase para
+    ``totals`` e ``summary_table``.
+    """
+
+    def __init__(self, hook: Optional[Callable[[Dict], None]] = None):
+        self.hook = hook
+        self.events: List[Dict] = []
+        self.by_repo: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, repo: Optional[str] = None, **fields):
+        event = {"event": phase, "repo": repo, "timestamp": time.time(), **fields}
+        with self._lock:
+            self.events.append(event)
+            if repo is not None:
+                totals = self.by_repo.setdefault(repo, {}).setdefault(phase, {})
+                for key, value in fields.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        totals[key] = totals.get(key, 0) + value
+            if self.hook is not None:
+                self.hook(event)
+
+    @contextmanager
+    def phase(self, phase: str, repo: Optional[str] = None, **fields):
+        # O bloco pode acrescentar campos no dict retornado antes do evento ser gravado
+        start = time.perf_counter()
+        extra = dict(fields)
+        try:
+            yield extra
+        finally:
+            self.record(phase, repo, seconds=time.perf_counter() - start, **extra)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for phases in self.by_repo.values():
+                for phase, fields in phases.items():
+                    phase_totals = totals.setdefault(phase, {})
+                    for key, value in fields.items():
+                        phase_totals[key] = phase_totals.get(key, 0) + value
+        return totals
+
+    def summary_table(self) -> str:
+        def cell(phases, phase, field, fmt):
+            value = phases.get(phase, {}).get(field)
+            if value is None:
+                return "-"
+            if fmt == "size":
+                return format_size(int(value))
+            return fmt.format(int(value) if fmt == "{:d}" else value)
+
+        with self._lock:
+            repos = sorted(self.by_repo.items())
+        rows = [[repo] + [cell(phases, *column[:2], column[3]) for column in SUMMARY_COLUMNS]
+                for repo, phases in repos]
+        total = self.totals()
+        rows.append(["TOTAL"] + [cell(total, *column[:2], column[3]) for column in SUMMARY_COLUMNS])
+
+        header = ["repositório"] + [column[2] for column in SUMMARY_COLUMNS]
+        widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+        separator = "  ".join("-" * width for width in widths)
+
+        def line(row):
+            return "  ".join([row[0].ljust(widths[0])]
+                             + [value.rjust(width) for value, width in zip(row[1:], widths[1:])])
+
+        return "\n".join([line(header), separator] + [line(row) for row in rows[:-1]]
+                         + [separator, line(rows[-1])])
@@ -0,0 +1,181 @@
+import os
+import re
+import stat
+import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+
+DEFAULT_EXCLUDES = ("node_modules", "*.min.js", "*.min.css", "*.map")
+DEFAULT_MAX_FILE_SIZE = 10 * 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
+
+
+def is_binary(data: bytes) -> bool:
+    return b"\0" in data[:BINARY_SNIFF_BYTES]
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+        size /= 1024
+
+
+def parse_globs(text: str) -> List[str]:
+    return [glob.strip() for glob in text.replace(";", ",").split(",") if glob.strip()]
+
+
+# Mesma regra do fnmatch.fnmatch: sem diferenciar maiúsculas onde o sistema não diferencia
+_GLOB_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+
+def _compile_globs(globs: Iterable[str]) -> Optional[Pattern]:
+    translated = [fnmatch.translate(glob) for glob in globs]
+    return re.compile("|".join(translated), _GLOB_FLAGS) if translated else None
+
+
+def _posix(rel_path: str) -> str:
+    return rel_path.replace(os.sep, "/") if os.sep != "/" else rel_path
+
+
+class FilterStats:
+    def __init__(self, record_paths: bool = False):
+        self.files_skipped = 0
+        self.bytes_skipped = 0
+        self.by_reason: Dict[str, int] = {}
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.match_seconds = 0.0
+        self.files_reused = 0
+        self.bytes_reused = 0
+        # Caminho -> motivo dos arquivos pulados já na leitura (ex: binário), só quando pedido
+        self.skipped_paths: Optional[Dict[str, str]] = {} if record_paths else None
+
+    def skip(self, reason: str, size: int, path: Optional[str] = None):
+        self.files_skipped += 1
+        self.bytes_skipped += size
+        self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+        if path is not None and self.skipped_paths is not None:
+            self.skipped_paths[path] = reason
+
+    def scanned(self, size: int, match_seconds: float):
+        self.files_scanned += 1
+        self.bytes_scanned += size
+        self.match_seconds += match_seconds
+
+    def reused(self, size: int):
+        # Conteúdo já lido em outro caminho ou repositório (mesmo hash de blob)
+        self.files_reused += 1
+        self.bytes_reused += size
+
+    def merge(self, other: "FilterStats"):
+        self.files_skipped += other.files_skipped
+        self.bytes_skipped += other.bytes_skipped
+        for reason, count in other.by_reason.items():
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + count
+        self.files_scanned += other.files_scanned
+        self.bytes_scanned += other.bytes_scanned
+        self.match_seconds += other.match_seconds
+        self.files_reused += other.files_reused
+        self.bytes_reused += other.bytes_reused
+        if self.skipped_paths is not None and other.skipped_paths:
+            self.skipped_paths.update(other.skipped_paths)
+
+    def summary(self) -> str:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.by_reason.items()))
+        return (f"{self.files_skipped} arquivo(s) ignorado(s), "
+                f"{format_size(self.bytes_skipped)} não lidos"
+                + (f" ({reasons})" if reasons else ""))
+
+
+class FileFilter:
+    """Decide quais arquivos são lidos na busca.
+
+    Globs sem "/" valem para o nome do arquivo e para qualquer diretório do caminho
+    (``node_modules`` exclui todas as pastas com esse nome); globs com "/" são
+    comparados com o caminho relativo inteiro (``docs/*.md``).
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = DEFAULT_EXCLUDES,
+                 max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE, skip_binary: bool = True,
+                 use_gitignore: bool = True,
+                 extra_filters: Iterable[Callable[[str], bool]] = ()):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.max_file_size = max_file_size
+        self.skip_binary = skip_binary
+        self.use_gitignore = use_gitignore
+        self.extra_filters = list(extra_filters)
+        # Todos os globs de cada papel numa só regex, compilada uma vez: por arquivo sobra
+        # uma chamada de match por parte do caminho, sem fnmatch nem PurePath
+        self._include = _compile_globs(self.include)
+        self._exclude_names = _compile_globs(glob for glob in self.exclude if "/" not in glob)
+        self._exclude_paths = _compile_globs(glob for glob in self.exclude if "/" in glob)
+
+    def add_filter(self, accept: Callable[[str], bool]):
+        self.extra_filters.append(accept)
+
+    def _excluded(self, posix_path: str) -> bool:
+        if self._exclude_paths is not None and self._exclude_paths.match(posix_path):
+            return True
+        if self._exclude_names is not None:
+            match = self._exclude_names.match
+            return any(match(part) for part in posix_path.split("/"))
+        return False
+
+    def path_skip_reason(self, rel_path: str) -> Optional[str]:
+        posix_path = _posix(rel_path)
+        if self._include is not None:
+            match = self._include.match
+            if not (match(posix_path) or match(posix_path.rpartition("/")[2])):
+                return "include"
+        if self._excluded(posix_path):
+            return "exclude"
+        if any(not accept(posix_path) for accept in self.extra_filters):
+            return "filtro"
+        return None
+
+    def skip_dir(self, rel_dir: str) -> bool:
+        return self._excluded(_posix(rel_dir))
+
+    def skip_reason(self, rel_path: str, size: int) -> Optional[str]:
+        if self.max_file_size is not None and size > self.max_file_size:
+            return "tamanho"
+        return self.path_skip_reason(rel_path)
+
+    def filter_entries(self, entries: List[Tuple[str, int]],
+                       stats: Optional[FilterStats] = None) -> List[str]:
+        accepted = []
+        for rel_path, size in entries:
+            reason = self.skip_reason(rel_path, size)
+            if reason is None:
+                accepted.append(rel_path)
+            elif stats is not None:
+                stats.skip(reason, size)
+        return accepted
+
+    def filter_paths(self, repo_path: Path, rel_paths: List[str],
+                     stats: Optional[FilterStats] = None) -> List[str]:
+        # O caminho é checado antes do stat; o tamanho de um caminho já recusado só
+        # interessa para as estatísticas
+        root = os.fspath(repo_path)
+        accepted = []
+        for rel_path in rel_paths:
+            reason = self.path_skip_reason(rel_path)
+            if reason is not None and stats is None:
+                continue
+            try:
+                file_stat = os.stat(os.path.join(root, rel_path))
+            except OSError:
+                continue
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+            size = file_stat.st_size
+            if self.max_file_size is not None and size > self.max_file_size:
+                reason = "tamanho"
+            if reason is None:
+                accepted.append(rel_path)
+            else:
+                stats.skip(reason, size)
+        return accepted
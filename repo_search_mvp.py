@@ -1,11 +1,18 @@
 import os
 import re
-import json
 import sys
 import shutil
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
+from search_engine import list_repo_files
+from result_set import ResultSet
+from result_sink import JsonlSink
+from path_filters import (
+    BINARY_SNIFF_BYTES, DEFAULT_EXCLUDES, DEFAULT_MAX_FILE_SIZE, FileFilter, FilterStats, is_binary
+)
+
 # Tentar encontrar e configurar Git antes de importar
 def find_git_executable():
     """Encontra o executável Git no sistema."""
@@ -105,39 +112,91 @@ def clone_or_update_repo(repo_name: str, repo_url: str, repo_path: Path) -> git.
         print(f"  ❌ Erro inesperado: {e}")
         raise
 
-def search_in_repo(repo_path: Path, search_string: str, repo_dirname: str) -> list:
-    """Busca uma string em todos os arquivos do repositório."""
-    results = []
+def list_files(repo_path: Path, use_gitignore: bool) -> list:
+    """Lista os arquivos do repositório (respeitando o .gitignore, se pedido)."""
+    if use_gitignore:
+        try:
+            repo = git.Repo(repo_path)
+            output = repo.git.ls_files("--cached", "--others", "--exclude-standard", "-z")
+            return sorted({str(Path(p)) for p in output.split("\0") if p})
+        except git.exc.GitError:
+            pass
+
+    return list_repo_files(repo_path)
+
+def search_in_repo(repo_path: Path, search_string: str, repo_dirname: str,
+                   file_filter: FileFilter = None, stats: FilterStats = None,
+                   sink=None) -> ResultSet:
+    """Busca uma string nos arquivos do repositório que passam pelos filtros.
+
+    Com ``sink`` (ex: JsonlSink), cada resultado vai direto para ele e nada fica em memória.
+    """
+    results = ResultSet()
+    emit = sink if sink is not None else results.append
     pattern = re.compile(search_string, re.IGNORECASE)
-    
-    for root, _, files in os.walk(repo_path):
-        # Ignorar pasta .git
-        if ".git" in root:
+    file_filter = file_filter or FileFilter()
+
+    rel_paths = list_files(repo_path, file_filter.use_gitignore)
+    for rel_path in file_filter.filter_paths(repo_path, rel_paths, stats):
+        file_path = repo_path / rel_path
+        try:
+            if file_filter.skip_binary:
+                with open(file_path, "rb") as f:
+                    if is_binary(f.read(BINARY_SNIFF_BYTES)):
+                        if stats is not None:
+                            stats.skip("binário", file_path.stat().st_size)
+                        continue
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                for i, line in enumerate(f, start=1):
+                    if pattern.search(line):
+                        emit({
+                            "repo": repo_dirname,
+                            "file": rel_path,
+                            "line_number": i,
+                            "line": line.strip()
+                        })
+        except (PermissionError, UnicodeDecodeError, IOError) as e:
+            # Ignorar arquivos sem permissão
             continue
-            
-        for file in files:
-            file_path = Path(root) / file
-            try:
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    for i, line in enumerate(f, start=1):
-                        if pattern.search(line):
-                            results.append({
-                                "repo": repo_dirname,
-                                "file": str(file_path.relative_to(repo_path)),
-                                "line_number": i,
-                                "line": line.strip()
-                            })
-            except (PermissionError, UnicodeDecodeError, IOError) as e:
-                # Ignorar arquivos binários ou sem permissão
-                continue
     
     return results
 
+def parse_args():
+    """Lê os filtros de arquivo da linha de comando."""
+    parser = argparse.ArgumentParser(description=f"Busca '{SEARCH_STRING}' nos repositórios configurados.")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="Buscar apenas arquivos que casam com o glob (pode repetir)")
+    parser.add_argument("--exclude", action="append", default=None, metavar="GLOB",
+                        help=f"Ignorar arquivos/pastas que casam com o glob (padrão: {', '.join(DEFAULT_EXCLUDES)})")
+    parser.add_argument("--max-file-size", type=float, default=DEFAULT_MAX_FILE_SIZE / (1024 * 1024),
+                        metavar="MB", help="Ignorar arquivos maiores que isso (0 desativa)")
+    parser.add_argument("--include-binary", action="store_true",
+                        help="Não ignorar arquivos binários")
+    parser.add_argument("--no-gitignore", action="store_true",
+                        help="Buscar também arquivos listados no .gitignore")
+    parser.add_argument("--output", default="resultado_busca.json", metavar="ARQUIVO",
+                        help="Arquivo de saída; .jsonl ou .jsonl.gz grava cada resultado assim que é encontrado")
+    return parser.parse_args()
+
 def main():
     """Função principal para executar a busca."""
+    args = parse_args()
+    file_filter = FileFilter(
+        include=args.include,
+        exclude=DEFAULT_EXCLUDES if args.exclude is None else args.exclude,
+        max_file_size=int(args.max_file_size * 1024 * 1024) or None,
+        skip_binary=not args.include_binary,
+        use_gitignore=not args.no_gitignore,
+    )
+    stats = FilterStats()
+
     print(f"\n🔍 Iniciando busca por '{SEARCH_STRING}' em {len(REPOS)} repositório(s)...\n")
     
-    results = []
+    output_file = args.output
+    # JSON Lines: cada resultado vai para o disco na hora e não fica acumulado na memória
+    sink = JsonlSink(output_file) if output_file.endswith((".jsonl", ".jsonl.gz")) else None
+    results = ResultSet()
+    found = 0
     
     for repo_name in REPOS:
         repo_url = build_url(repo_name, user, token)
@@ -148,19 +207,27 @@ def main():
 
         try:
             clone_or_update_repo(repo_name, repo_url, repo_path)
-            repo_results = search_in_repo(repo_path, SEARCH_STRING, repo_dirname)
+            written = sink.count if sink is not None else 0
+            repo_results = search_in_repo(repo_path, SEARCH_STRING, repo_dirname, file_filter, stats,
+                                          sink=sink)
+            repo_found = sink.count - written if sink is not None else len(repo_results)
+            found += repo_found
             results.extend(repo_results)
-            print(f"  ✅ Encontrados {len(repo_results)} resultado(s)")
+            print(f"  ✅ Encontrados {repo_found} resultado(s)")
         except Exception as e:
             print(f"  ❌ Erro ao processar {repo_dirname}: {e}")
             continue
 
     # Salvar resultados
-    output_file = "resultado_busca.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-
-    print(f"\n✅ Busca concluída! {len(results)} resultado(s) encontrado(s)")
+    if sink is not None:
+        sink.close()
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            results.write_json(f)
+
+    print(f"\n✅ Busca concluída! {found} resultado(s) encontrado(s)")
+    if stats.files_skipped:
+        print(f"🧹 Filtros: {stats.summary()}")
     print(f"📄 Resultados salvos em {output_file}")
 
 if __name__ == "__main__":
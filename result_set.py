@@ -0,0 +1,112 @@
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+
+class ResultSet:
+    """Resultados de busca em colunas.
+
+    Nomes de repositório, arquivo e termo são guardados uma vez só e referenciados
+    por índice em arrays compactos; o dict de cada resultado é montado apenas quando
+    a linha é lida (indexação ou iteração).
+    """
+
+    def __init__(self, results: Iterable[Dict] = ()):
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._repos = array("I")
+        self._files = array("I")
+        self._line_numbers = array("I")
+        self._lines: List[str] = []
+        # Só existe quando algum resultado veio de busca com vários termos
+        self._terms: Optional[array] = None
+        # Idem para o contexto (linhas antes, linhas depois) de buscas com context_lines
+        self._contexts: Optional[List[Optional[Tuple[List[str], List[str]]]]] = None
+        self.extend(results)
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            self._names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def append(self, result: Dict):
+        self._repos.append(self._intern(result["repo"]))
+        self._files.append(self._intern(result["file"]))
+        self._line_numbers.append(result["line_number"])
+        self._lines.append(result["line"])
+        term = result.get("term")
+        if term is not None and self._terms is None:
+            self._terms = array("i", [-1]) * (len(self._lines) - 1)
+        if self._terms is not None:
+            self._terms.append(-1 if term is None else self._intern(term))
+        context = ((result["context_before"], result["context_after"])
+                   if "context_before" in result else None)
+        if context is not None and self._contexts is None:
+            self._contexts = [None] * (len(self._lines) - 1)
+        if self._contexts is not None:
+            self._contexts.append(context)
+
+    def extend(self, results: Iterable[Dict]):
+        for result in results:
+            self.append(result)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __getitem__(self, row: int) -> Dict:
+        if row < 0:
+            row += len(self._lines)
+        if not 0 <= row < len(self._lines):
+            raise IndexError("índice de resultado fora do intervalo")
+        result = {
+            "repo": self._names[self._repos[row]],
+            "file": self._names[self._files[row]],
+            "line_number": self._line_numbers[row],
+            "line": self._lines[row],
+        }
+        if self._terms is not None and self._terms[row] >= 0:
+            result["term"] = self._names[self._terms[row]]
+        if self._contexts is not None and self._contexts[row] is not None:
+            result["context_before"], result["context_after"] = self._contexts[row]
+        return result
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(len(self._lines)):
+            yield self[row]
+
+    def clear(self):
+        self.__init__()
+
+    def reorder(self, rows: List[int]):
+        self._repos = array("I", (self._repos[row] for row in rows))
+        self._files = array("I", (self._files[row] for row in rows))
+        self._line_numbers = array("I", (self._line_numbers[row] for row in rows))
+        self._lines = [self._lines[row] for row in rows]
+        if self._terms is not None:
+            self._terms = array("i", (self._terms[row] for row in rows))
+        if self._contexts is not None:
+            self._contexts = [self._contexts[row] for row in rows]
+
+    def group_by_repo(self, repo_order: Iterable[str]):
+        # Ordem estável: dentro de cada repositório os resultados mantêm a ordem de chegada
+        rank = {self._name_ids[repo]: position for position, repo in enumerate(repo_order)
+                if repo in self._name_ids}
+        self.reorder(sorted(range(len(self._lines)),
+                            key=lambda row: rank.get(self._repos[row], len(rank))))
+
+    def write_json(self, f: TextIO, indent: int = 2):
+        # Mesmo formato de json.dump(lista, indent=2), sem montar a lista inteira na memória
+        if not self._lines:
+            f.write("[]")
+            return
+        padding = " " * indent
+        f.write("[\n")
+        for row, result in enumerate(self):
+            if row:
+                f.write(",\n")
+            encoded = json.dumps(result, indent=indent, ensure_ascii=False)
+            f.write(padding + encoded.replace("\n", "\n" + padding))
+        f.write("\n]")
@@ -0,0 +1,75 @@
+import io
+import gzip
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+class JsonlSink:
+    """Grava cada resultado como uma linha JSON assim que ele chega.
+
+    Pode ser passado direto como ``result_callback`` de ``RepoSearcher.search_repos``.
+    Sem compressão cada linha vai para o disco na hora (dá para acompanhar com
+    ``tail -f``); com gzip o fluxo é sincronizado a cada ``flush_interval`` segundos,
+    então um ``zcat`` durante a busca lê tudo até a última sincronização.
+    """
+
+    def __init__(self, path: Path, compress: Optional[bool] = None, flush_interval: float = 1.0):
+        self.path = Path(path)
+        if compress is None:
+            compress = self.path.suffix == ".gz"
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if compress:
+            self._raw = gzip.open(self.path, "wb")
+            self._file = io.TextIOWrapper(self._raw, encoding="utf-8", newline="\n")
+        else:
+            self._raw = None
+            self._file = open(self.path, "w", encoding="utf-8", newline="\n", buffering=1)
+        self._last_flush = time.monotonic()
+
+    def write(self, result: Dict):
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+            if self.compress and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    __call__ = write
+
+    def write_all(self, results: Iterable[Dict]):
+        for result in results:
+            self.write(result)
+
+    def _flush(self):
+        self._file.flush()
+        if self._raw is not None:
+            # Z_SYNC_FLUSH: o que já foi escrito fica legível sem fechar o gzip
+            self._raw.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_jsonl(path: Path) -> Iterable[Dict]:
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,78 @@
+import os
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from path_filters import FileFilter
+from search_engine import Query
+
+
+STORE_VERSION = 1
+
+
+def query_key(search_string: Query, file_filter: FileFilter, source: str) -> str:
+    # Filtros e origem (árvore de trabalho ou ref) mudam os arquivos lidos, então entram na chave
+    spec = {
+        "query": search_string if isinstance(search_string, str) else list(search_string),
+        "source": source,
+        "include": file_filter.include,
+        "exclude": file_filter.exclude,
+        "max_file_size": file_filter.max_file_size,
+        "skip_binary": file_filter.skip_binary,
+        "use_gitignore": file_filter.use_gitignore,
+        "extra_filters": [getattr(accept, "__qualname__", repr(accept))
+                          for accept in file_filter.extra_filters],
+    }
+    encoded = json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class StoredResults:
+    """Resultados de uma busca num repositório e o commit de onde vieram."""
+
+    def __init__(self, store_path: Path):
+        self.store_path = Path(store_path)
+        self.commit: Optional[str] = None
+        self.results: List[Dict] = []
+
+    @classmethod
+    def load(cls, store_path: Path) -> "StoredResults":
+        stored = cls(store_path)
+        try:
+            with open(store_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return stored
+        if data.get("version") != STORE_VERSION:
+            return stored
+        stored.commit = data["commit"]
+        stored.results = data["results"]
+        return stored
+
+    def save(self, search_string: Query):
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        # Temporário único: duas buscas iguais ao mesmo tempo não escrevem no mesmo arquivo
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_path.parent, prefix=self.store_path.name,
+                                        suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": STORE_VERSION,
+                    "query": search_string,
+                    "commit": self.commit,
+                    "results": self.results,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, self.store_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def unchanged(self, changed_paths: List[str]) -> List[Dict]:
+        # Resultados de arquivos alterados ou removidos são descartados e relidos
+        changed = set(changed_paths)
+        return [result for result in self.results if result["file"] not in changed]
@@ -0,0 +1,526 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import socketserver
+import multiprocessing
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+from blob_cache import BlobCachePool
+from git_objects import CLONE_MODES, GitObjectError
+from gitlab_collector import GitLabCollector
+from path_filters import DEFAULT_EXCLUDES, DEFAULT_MAX_FILE_SIZE, FileFilter
+from repo_searcher import FreshnessState, RepoSearcher
+from search_engine import ProcessSearchBackend
+
+
+DEFAULT_GITLAB_URL = "https://gitlab.nelogica.com.br/"
+DEFAULT_PORT = 8765
+
+# Campos de "filters" aceitos em POST /search (mesmos nomes do FileFilter)
+FILTER_FIELDS = ("include", "exclude", "max_file_size", "skip_binary", "use_gitignore")
+
+
+class RequestError(Exception):
+    pass
+
+
+# Campos do JSON checados antes de chegar às threads da busca: um tipo errado vira 400,
+# não um TypeError no meio da resposta
+def _int_field(data: Dict, name: str, minimum: int) -> Optional[int]:
+    value = data.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise RequestError(f"Campo '{name}' deve ser um inteiro >= {minimum}")
+    return value
+
+
+def _bool_field(data: Dict, name: str, default: bool) -> bool:
+    value = data.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise RequestError(f"Campo '{name}' deve ser true ou false")
+    return value
+
+
+def _str_field(data: Dict, name: str) -> Optional[str]:
+    value = data.get(name)
+    if value is not None and not isinstance(value, str):
+        raise RequestError(f"Campo '{name}' deve ser um texto")
+    return value
+
+
+def _str_list(data: Dict, name: str) -> List[str]:
+    value = data.get(name)
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RequestError(f"Campo '{name}' deve ser uma lista de textos")
+    return value
+
+
+class SearchDaemon:
+    """Serviço de busca de longa duração sobre um ``repos_temp`` próprio.
+
+    Mantém os repositórios consultados atualizados em segundo plano (a cada
+    ``refresh_interval`` segundos) e guarda em memória as listagens de grupos, os
+    índices de trigramas, os caches de blobs e o pool de processos entre as buscas.
+    As buscas não consultam o servidor remoto nem atualizam clones: confiam no último
+    refresh e só clonam o que falta.
+    """
+
+    def __init__(self, token: str, base_dir: Path = Path("repos_temp"),
+                 gitlab_url: Optional[str] = DEFAULT_GITLAB_URL,
+                 groups: Optional[List[str]] = None, repos: Optional[List[str]] = None,
+                 prefix: Optional[str] = None, refresh_interval: float = 300,
+                 clone_mode: str = "mirror", search_backend: str = "git",
+                 fetch_workers: int = 4, search_workers: int = 2,
+                 use_index: bool = False, dedup_blobs: bool = True, log=None):
+        self.token = token
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.gitlab_url = gitlab_url
+        self.refresh_interval = refresh_interval
+        self.clone_mode = clone_mode
+        self.search_backend = search_backend
+        self.fetch_workers = fetch_workers
+        self.search_workers = search_workers
+        self.use_index = use_index
+        self.dedup_blobs = dedup_blobs
+        self.log = log or (lambda message: None)
+        self.collector = GitLabCollector(token, gitlab_url) if gitlab_url else None
+        self.blob_caches = BlobCachePool(self.base_dir / ".blobs")
+        self.index_cache = {}
+        # Um só estado de .freshness.json para todas as instâncias de RepoSearcher do serviço
+        self.freshness = FreshnessState(self.base_dir / ".freshness.json")
+        self.process_backend = ProcessSearchBackend() if search_backend == "process" else None
+        # Grupo -> repositórios, atualizado a cada refresh
+        self._groups: Dict[str, List[str]] = {}
+        # Repositórios mantidos atualizados, na ordem em que foram pedidos
+        self._watched: Dict[str, None] = dict.fromkeys(repos or [])
+        self._lock = threading.Lock()
+        # Um clone/fetch por vez no mesmo repositório: o refresh e os clones sob demanda
+        self._fetch_lock = threading.Lock()
+        self._initial = [(group, prefix) for group in groups or []]
+        self._refresh_now = threading.Event()
+        self._stop = threading.Event()
+        self._refreshing = False
+        self.last_refresh: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _searcher(self, **kwargs) -> RepoSearcher:
+        return RepoSearcher(
+            self.token,
+            base_dir=self.base_dir,
+            gitlab_url=self.gitlab_url,
+            fetch_workers=self.fetch_workers,
+            search_workers=self.search_workers,
+            search_backend=self.search_backend,
+            clone_mode=self.clone_mode,
+            use_index=self.use_index,
+            index_cache=self.index_cache,
+            blob_caches=self.blob_caches,
+            dedup_blobs=self.dedup_blobs,
+            freshness=self.freshness,
+            process_backend=self.process_backend,
+            **kwargs,
+        )
+
+    def group_repos(self, group_path: str, prefix: Optional[str] = None) -> List[str]:
+        with self._lock:
+            repos = self._groups.get(group_path)
+        if repos is None:
+            if self.collector is None:
+                raise RequestError("Grupos só estão disponíveis com GitLab")
+            repos = self.collector.get_group_repositories(group_path)
+            with self._lock:
+                self._groups[group_path] = repos
+        return [repo for repo in repos if repo.startswith(prefix)] if prefix else list(repos)
+
+    def resolve_repos(self, repos: List[str], groups: List[str],
+                      prefix: Optional[str] = None) -> List[str]:
+        resolved = list(repos)
+        for group_path in groups:
+            resolved.extend(self.group_repos(group_path, prefix))
+        return list(dict.fromkeys(resolved))
+
+    def watch(self, repos: List[str]):
+        with self._lock:
+            self._watched.update(dict.fromkeys(repos))
+
+    def ensure_cloned(self, repos: List[str], progress_callback=None):
+        searcher = self._searcher()
+        missing = [repo for repo in repos if not searcher.repo_path_for(repo).exists()]
+        if missing:
+            with self._fetch_lock:
+                # Outra busca pode ter clonado enquanto esta esperava o lock
+                missing = [repo for repo in missing if not searcher.repo_path_for(repo).exists()]
+                if missing:
+                    searcher.refresh_repos(missing, progress_callback)
+
+    def refresh(self):
+        with self._lock:
+            groups = list(self._groups)
+            self._refreshing = True
+        start = time.perf_counter()
+        try:
+            for group_path in groups:
+                try:
+                    repos = self.collector.get_group_repositories(group_path, refresh=True)
+                except Exception as e:
+                    self.log(f"Erro ao listar {group_path}: {e}")
+                    continue
+                with self._lock:
+                    self._groups[group_path] = repos
+                self.watch(repos)
+            with self._lock:
+                repos = list(self._watched)
+            # Sem TTL: o refresh é justamente quem consulta o remoto (ls-remote) e atualiza
+            with self._fetch_lock:
+                available = self._searcher(freshness_ttl=0).refresh_repos(repos, self.log)
+            self.last_refresh = time.time()
+            self.log(f"🔄 {len(available)}/{len(repos)} repositório(s) atualizado(s) em "
+                     f"{time.perf_counter() - start:.1f}s")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_loop(self):
+        for group_path, prefix in self._initial:
+            try:
+                self.watch(self.group_repos(group_path, prefix))
+            except Exception as e:
+                self.log(f"Erro ao listar {group_path}: {e}")
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.log(f"Erro no refresh: {e}")
+            self._refresh_now.wait(self.refresh_interval)
+            self._refresh_now.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._refresh_loop, name="daemon-refresh", daemon=True)
+        self._thread.start()
+
+    def request_refresh(self):
+        self._refresh_now.set()
+
+    def stop(self):
+        self._stop.set()
+        self._refresh_now.set()
+        if self.process_backend is not None:
+            self.process_backend.shutdown()
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "repos": len(self._watched),
+                "groups": sorted(self._groups),
+                "refreshing": self._refreshing,
+                "last_refresh": self.last_refresh,
+                "refresh_interval": self.refresh_interval,
+                "clone_mode": self.clone_mode,
+                "backend": self.search_backend,
+            }
+
+    def search(self, request: Dict, emit: Callable[[Dict], None]):
+        query = request.get("query")
+        if isinstance(query, list) and len(query) == 1:
+            query = query[0]
+        terms_ok = isinstance(query, list) and all(isinstance(term, str) for term in query)
+        if not query or not (isinstance(query, str) or terms_ok):
+            raise RequestError("Campo 'query' obrigatório: texto ou lista de textos")
+        filters = request.get("filters")
+        if filters is None:
+            filters = {}
+        if not isinstance(filters, dict):
+            raise RequestError("Campo 'filters' deve ser um objeto")
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise RequestError(f"Filtros desconhecidos: {', '.join(sorted(unknown))}")
+        file_filter = FileFilter(
+            include=_str_list(filters, "include") or (),
+            exclude=(DEFAULT_EXCLUDES if filters.get("exclude") is None
+                     else _str_list(filters, "exclude")),
+            max_file_size=(_int_field(filters, "max_file_size", 0)
+                           if "max_file_size" in filters else DEFAULT_MAX_FILE_SIZE),
+            skip_binary=_bool_field(filters, "skip_binary", True),
+            use_gitignore=_bool_field(filters, "use_gitignore", True),
+        )
+        context_lines = _int_field(request, "context_lines", 0) or 0
+        max_results = _int_field(request, "max_results", 1)
+        prefix = _str_field(request, "prefix")
+        ref = _str_field(request, "ref") or "HEAD"
+        if self.clone_mode == "shallow" and ref != "HEAD":
+            raise RequestError("Clones rasos (shallow) só trazem o branch padrão: 'ref' indisponível")
+        repos = self.resolve_repos(_str_list(request, "repos"), _str_list(request, "groups"), prefix)
+        if not repos:
+            raise RequestError("Nenhum repositório informado (repos ou groups)")
+
+        progress_callback = None
+        if request.get("progress"):
+            def progress_callback(message):
+                # Chamado pelas threads da busca: um cliente que caiu não pode derrubar o worker
+                try:
+                    emit({"event": "progress", "message": message})
+                except OSError:
+                    pass
+
+        start = time.perf_counter()
+        self.ensure_cloned(repos, progress_callback)
+        self.watch(repos)
+        # Os repositórios já verificados pelo refresh valem até o próximo: nada de ls-remote,
+        # fetch ou pull aqui (quem atualiza é o refresh, sob o _fetch_lock)
+        searcher = self._searcher(update_repos=False, file_filter=file_filter,
+                                  search_ref=ref, context_lines=context_lines)
+        found = 0
+        results = searcher.iter_results(repos, query, progress_callback, max_results)
+        try:
+            for result in results:
+                emit(result)
+                found += 1
+        finally:
+            # Se emit falhar (cliente desconectado), fechar o gerador cancela os workers
+            results.close()
+        stats = searcher.filter_stats
+        emit({"event": "done", "found": found, "repos": repos,
+              "summary": stats.summary() if stats.files_skipped else "",
+              "seconds": round(time.perf_counter() - start, 3)})
+
+    def context(self, request: Dict) -> Dict:
+        # Janela de detalhes dos clientes: os resultados vêm sem contexto e o trecho é lido
+        # sob demanda, do clone e da ref buscados
+        repo, rel_path = _str_field(request, "repo"), _str_field(request, "file")
+        line_number = _int_field(request, "line_number", 1)
+        context_lines = _int_field(request, "context_lines", 0)
+        if repo is None or rel_path is None or line_number is None:
+            raise RequestError("Campos 'repo', 'file' e 'line_number' obrigatórios")
+        if context_lines is None:
+            context_lines = 10
+        with self._lock:
+            watched = repo in self._watched
+        if not watched:
+            raise RequestError(f"Repositório não buscado pelo serviço: {repo}")
+        ref = _str_field(request, "ref") or "HEAD"
+        try:
+            # ValueError: caminho fora do clone ou ref indisponível no modo de clone
+            searcher = self._searcher(update_repos=False, search_ref=ref)
+            lines = searcher.get_context(repo, rel_path, line_number, context_lines)
+        except (OSError, GitObjectError, ValueError) as e:
+            raise RequestError(str(e)) from e
+        return {"lines": lines}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "RepoSearchDaemon/1"
+
+    def log_message(self, format, *args):
+        self.server.search_daemon.log(f"{self.command} {self.path} — {format % args}")
+
+    def log_request(self, code="-", size="-"):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            raise RequestError(f"JSON inválido: {e}") from e
+        if not isinstance(payload, dict):
+            raise RequestError("O corpo deve ser um objeto JSON")
+        return payload
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, self.server.search_daemon.status())
+        else:
+            self._send_json(404, {"error": "Caminho desconhecido"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        try:
+            payload = self._read_json()
+        except RequestError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if path == "/refresh":
+            self.server.search_daemon.request_refresh()
+            self._send_json(202, {"status": "refresh agendado"})
+        elif path == "/search":
+            self._search(payload)
+        elif path == "/context":
+            try:
+                self._send_json(200, self.server.search_daemon.context(payload))
+            except RequestError as e:
+                self._send_json(400, {"error": str(e)})
+        else:
+            self._send_json(404, {"error": "Caminho desconhecido"})
+
+    def _search(self, payload: Dict):
+        write_lock = threading.Lock()
+        started = False
+
+        def emit(item: Dict):
+            nonlocal started
+            line = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+            with write_lock:
+                if not started:
+                    # Resposta em chunks: cada linha JSON sai assim que o resultado é encontrado
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    started = True
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+
+        try:
+            self.server.search_daemon.search(payload, emit)
+        except RequestError as e:
+            if not started:
+                self._send_json(400, {"error": str(e)})
+                return
+            emit({"event": "error", "message": str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            # Cliente desconectou: sair do laço já cancelou a busca (fechando o gerador)
+            self.close_connection = True
+            return
+        except Exception as e:
+            if not started:
+                self._send_json(500, {"error": str(e)})
+                return
+            try:
+                emit({"event": "error", "message": str(e)})
+            except OSError:
+                self.close_connection = True
+                return
+        try:
+            with write_lock:
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+        except OSError:
+            self.close_connection = True
+
+
+class _DaemonHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address, search_daemon: SearchDaemon):
+        self.search_daemon = search_daemon
+        super().__init__(address, _Handler)
+
+
+class _DaemonUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, search_daemon: SearchDaemon):
+        self.search_daemon = search_daemon
+        if os.path.exists(path):
+            # Socket de uma execução anterior; se ainda houver alguém escutando, o bind falha igual
+            os.unlink(path)
+        super().__init__(path, _Handler)
+
+
+def serve(search_daemon: SearchDaemon, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+          socket_path: Optional[str] = None):
+    if socket_path and not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Sockets Unix não são suportados neste sistema")
+    server = (_DaemonUnixServer(socket_path, search_daemon) if socket_path
+              else _DaemonHTTPServer((host, port), search_daemon))
+    search_daemon.start()
+    address = f"unix:{socket_path}" if socket_path else f"http://{host}:{server.server_address[1]}"
+    search_daemon.log(f"🚀 Serviço de busca em {address}")
+    try:
+        server.serve_forever()
+    finally:
+        search_daemon.stop()
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serviço de busca: mantém os repositórios atualizados e responde buscas "
+                    "por HTTP local ou socket Unix")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", metavar="CAMINHO", help="Escutar num socket Unix em vez de TCP")
+    parser.add_argument("--group", action="append", default=[], metavar="GRUPO",
+                        help="Grupo mantido atualizado desde o início (pode repetir)")
+    parser.add_argument("--prefix", metavar="PREFIXO")
+    parser.add_argument("--repos", nargs="+", default=[], metavar="REPO")
+    parser.add_argument("--refresh-interval", type=float, default=300, metavar="SEGUNDOS")
+    parser.add_argument("--gitlab-url", default=os.getenv("GITLAB_URL", DEFAULT_GITLAB_URL))
+    parser.add_argument("--token", help="Token de acesso (padrão: GITLAB_TOKEN ou GITHUB_TOKEN)")
+    parser.add_argument("--github", action="store_true")
+    parser.add_argument("--base-dir", type=Path, default=Path("repos_temp"))
+    parser.add_argument("--clone-mode", choices=CLONE_MODES, default="mirror")
+    parser.add_argument("--backend", choices=("thread", "process", "git"), default="git")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--search-workers", type=int, default=2)
+    parser.add_argument("--use-index", action="store_true")
+    parser.add_argument("--no-dedup-blobs", action="store_true")
+    parser.add_argument("--quiet", "-q", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    args = parse_args(argv)
+    token = args.token or os.getenv("GITHUB_TOKEN" if args.github else "GITLAB_TOKEN")
+    if not token:
+        print("❌ Token não informado (--token, GITLAB_TOKEN ou GITHUB_TOKEN)", file=sys.stderr)
+        return 2
+    if args.host not in ("127.0.0.1", "localhost", "::1") and not args.socket:
+        print(f"⚠️ Escutando em {args.host}: qualquer um que alcance a porta busca com o seu token",
+              file=sys.stderr)
+
+    def log(message):
+        if not args.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    search_daemon = SearchDaemon(
+        token,
+        base_dir=args.base_dir,
+        gitlab_url=None if args.github else args.gitlab_url,
+        groups=args.group,
+        repos=args.repos,
+        prefix=args.prefix,
+        refresh_interval=args.refresh_interval,
+        clone_mode=args.clone_mode,
+        search_backend=args.backend,
+        fetch_workers=args.fetch_workers,
+        search_workers=args.search_workers,
+        use_index=args.use_index,
+        dedup_blobs=not args.no_dedup_blobs,
+        log=log,
+    )
+    try:
+        serve(search_daemon, args.host, args.port, args.socket)
+    except KeyboardInterrupt:
+        log("⚠️ Serviço encerrado")
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,521 @@
+import os
+import re
+import time
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+from path_filters import BINARY_SNIFF_BYTES, FilterStats, is_binary
+
+
+_worker_cancel_event = None
+
+
+Query = Union[str, Sequence[str]]
+
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()\n\r")
+_LOOKAROUNDS = ("?=", "?!", "?<=", "?<!")
+# Únicos caracteres não ASCII que o IGNORECASE do re iguala a letras ASCII
+# sem que str.lower() faça o mesmo (İ ainda muda o tamanho do texto ao minusculizar)
+_CASE_FOLD_TRAPS = ("\u0130", "\u0131", "\u017f")
+
+
+def _lowered_for_literal(text: str) -> Optional[str]:
+    if not text.isascii() and any(trap in text for trap in _CASE_FOLD_TRAPS):
+        return None
+    return text.lower()
+
+
+class LiteralPattern:
+    """Busca literal sem diferenciar maiúsculas: str.find sobre o texto minusculizado.
+
+    Expõe search/pattern/flags como um re.Pattern (delegando para a regex equivalente)
+    para os caminhos que testam linha a linha.
+    """
+
+    def __init__(self, literal: str):
+        self.literal = literal
+        self.needle = literal.lower()
+        self.regex = re.compile(re.escape(literal), re.IGNORECASE)
+        self.pattern = self.regex.pattern
+        self.flags = self.regex.flags
+        self.fast = literal.isascii()
+
+    def search(self, string: str, *args):
+        return self.regex.search(string, *args)
+
+
+class MultiPattern:
+    """Vários termos buscados numa única passada pelo arquivo.
+
+    Com todos os termos literais ASCII, as linhas candidatas vêm de um str.find por
+    termo sobre o texto minusculizado (a próxima ocorrência de cada um, sem regex);
+    nos demais casos, de uma alternação com todos os termos. Cada termo é testado só
+    nessas linhas, e cada resultado recebe o termo que casou.
+    """
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms = list(dict.fromkeys(terms))
+        self.term_patterns = [compile_pattern(term) for term in self.terms]
+        literals = [p for p in self.term_patterns if isinstance(p, LiteralPattern)]
+        self.fast = len(literals) == len(self.term_patterns) and all(p.fast for p in literals)
+        self.needles = [p.needle for p in literals] if self.fast else []
+        try:
+            self.regex = re.compile("|".join(f"(?:{p.pattern})" for p in self.term_patterns),
+                                    re.IGNORECASE)
+        except re.error:
+            # Flags inline (ex.: "(?i)") não podem ir para o meio de uma alternação
+            self.regex = None
+
+    def search(self, string: str, *args):
+        for pattern in self.term_patterns:
+            match = pattern.search(string, *args)
+            if match:
+                return match
+        return None
+
+    def matching_terms(self, line: str, lowered_line: Optional[str] = None) -> List[str]:
+        if lowered_line is not None:
+            return [term for term, needle in zip(self.terms, self.needles) if needle in lowered_line]
+        return [term for term, pattern in zip(self.terms, self.term_patterns)
+                if pattern.search(line)]
+
+
+def is_literal(search_string: str) -> bool:
+    return not _REGEX_METACHARS.intersection(search_string)
+
+
+def compile_pattern(search_string: Query):
+    if not isinstance(search_string, str):
+        return MultiPattern(search_string)
+    if is_literal(search_string):
+        return LiteralPattern(search_string)
+    try:
+        return re.compile(search_string, re.IGNORECASE)
+    except re.error:
+        return LiteralPattern(search_string)
+
+
+def walk_repo_files(repo_path: Path, cancel_event=None,
+                    skip_dir: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, int]]:
+    # os.scandir com pilha explícita: .git e pastas excluídas nunca são listadas,
+    # e o caminho relativo é montado como string, sem objetos Path por arquivo
+    found = []
+    stack = [("", os.fspath(repo_path))]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+
+        prefix, dir_path = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name == ".git":
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            rel_dir = prefix + name
+                            if skip_dir is None or not skip_dir(rel_dir):
+                                subdirs.append((rel_dir + os.sep, entry.path))
+                        elif entry.is_file():
+                            found.append((prefix + name, entry.stat().st_size))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Mesma ordem do os.walk: arquivos da pasta antes das subpastas, na ordem listada
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def list_repo_files(repo_path: Path, cancel_event=None,
+                    skip_dir: Optional[Callable[[str], bool]] = None) -> List[str]:
+    return [rel_path for rel_path, _ in walk_repo_files(repo_path, cancel_event, skip_dir)]
+
+
+SCAN_MODES = ("buffer", "line")
+
+
+def _search_file_lines(file_path: Path, rel_path: str, pattern,
+                       repo_dirname: str, cancel_event=None, context_lines: int = 0) -> List[Dict]:
+    results = []
+    # Linhas anteriores e resultados que ainda esperam as linhas seguintes (com context_lines)
+    previous = deque(maxlen=context_lines)
+    waiting = []
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(f, start=1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            if waiting:
+                for result in waiting:
+                    result["context_after"].append(line.rstrip("\n"))
+                waiting = [result for result in waiting if len(result["context_after"]) < context_lines]
+            found = len(results)
+            if isinstance(pattern, MultiPattern):
+                for term in pattern.matching_terms(line):
+                    results.append({
+                        "repo": repo_dirname,
+                        "file": rel_path,
+                        "line_number": i,
+                        "line": line.strip(),
+                        "term": term
+                    })
+            elif pattern.search(line):
+                results.append({
+                    "repo": repo_dirname,
+                    "file": rel_path,
+                    "line_number": i,
+                    "line": line.strip()
+                })
+            if context_lines:
+                for result in results[found:]:
+                    result["context_before"] = list(previous)
+                    result["context_after"] = []
+                    waiting.append(result)
+                previous.append(line.rstrip("\n"))
+    return results
+
+
+def decode_text(data: bytes) -> str:
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        # Mesma quebra de linha universal do modo texto usado na busca por linha
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_text(file_path: Path) -> str:
+    with open(file_path, "rb") as f:
+        return decode_text(f.read())
+
+
+def context_around(text: str, line_start: int, line_end: int,
+                   context_lines: int) -> Tuple[List[str], List[str]]:
+    # Linhas vizinhas da linha text[line_start:line_end], sem a quebra de linha
+    before = []
+    pos = line_start
+    while pos > 0 and len(before) < context_lines:
+        previous_start = text.rfind("\n", 0, pos - 1) + 1
+        before.append(text[previous_start:pos - 1])
+        pos = previous_start
+    before.reverse()
+
+    after = []
+    pos = line_end
+    while pos < len(text) and len(after) < context_lines:
+        end = text.find("\n", pos)
+        if end == -1:
+            after.append(text[pos:])
+            break
+        after.append(text[pos:end])
+        pos = end + 1
+    return before, after
+
+
+def _match_finder(text: str, lowered: Optional[str],
+                  pattern) -> Callable[[int], Optional[Tuple[int, int]]]:
+    if lowered is not None and isinstance(pattern, LiteralPattern):
+        needle = pattern.needle
+        needle_len = len(needle)
+
+        def find(pos: int):
+            start = lowered.find(needle, pos)
+            return None if start < 0 else (start, start + needle_len)
+        return find
+
+    if lowered is not None:
+        # Próxima ocorrência de cada termo, recalculada só quando a busca passa dela
+        needles = [(needle, len(needle)) for needle in pattern.needles]
+        next_starts = [-1] * len(needles)
+
+        def find(pos: int):
+            best = None
+            for i, (needle, needle_len) in enumerate(needles):
+                start = next_starts[i]
+                if start != -2 and start < pos:
+                    start = lowered.find(needle, pos)
+                    next_starts[i] = start if start >= 0 else -2
+                if start >= 0 and (best is None or start < best[0]):
+                    best = (start, start + needle_len)
+            return best
+        return find
+
+    # Com MULTILINE, ^ e $ casam nas quebras de linha do buffer como casariam linha a linha
+    if isinstance(pattern, MultiPattern) and pattern.regex is None:
+        searchers = [re.compile(p.pattern, p.flags | re.MULTILINE).search
+                     for p in pattern.term_patterns]
+    else:
+        regex = pattern.regex if isinstance(pattern, (LiteralPattern, MultiPattern)) else pattern
+        searchers = [re.compile(regex.pattern, regex.flags | re.MULTILINE).search]
+
+    def find(pos: int):
+        spans = [match.span() for match in (search(text, pos) for search in searchers)
+                 if match is not None]
+        return min(spans) if spans else None
+    return find
+
+
+def _needs_line_scan(pattern) -> bool:
+    # \A, \Z e lookarounds enxergam além da linha quando a regex roda sobre o buffer inteiro
+    # (\Afoo casaria só na primeira linha, (?<=\n)x nunca casaria linha a linha); um falso
+    # positivo só custa velocidade
+    if isinstance(pattern, LiteralPattern):
+        return False
+    if isinstance(pattern, MultiPattern):
+        return any(_needs_line_scan(term) for term in pattern.term_patterns)
+    source = pattern.pattern
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c == "\\":
+            if source[i + 1:i + 2] in ("A", "Z"):
+                return True
+            i += 2
+            continue
+        if c == "(" and source.startswith(_LOOKAROUNDS, i + 1):
+            return True
+        i += 1
+    return False
+
+
+def _line_results(text: str, line_start: int, line_end: int, line_number: int, terms: list,
+                  rel_path: str, repo_dirname: str, context_lines: int) -> List[Dict]:
+    line = text[line_start:line_end]
+    context = context_around(text, line_start, line_end, context_lines) if context_lines else None
+    results = []
+    for term in terms:
+        result = {
+            "repo": repo_dirname,
+            "file": rel_path,
+            "line_number": line_number,
+            "line": line.strip()
+        }
+        if term is not None:
+            result["term"] = term
+        if context is not None:
+            result["context_before"] = list(context[0])
+            result["context_after"] = list(context[1])
+        results.append(result)
+    return results
+
+
+def _search_text_lines(text: str, rel_path: str, pattern, repo_dirname: str,
+                       cancel_event=None, context_lines: int = 0) -> List[Dict]:
+    # Mesma regra do modo "line": a regex vê uma linha por vez, com a quebra no fim
+    multi = isinstance(pattern, MultiPattern)
+    results = []
+    line_number = 0
+    pos = 0
+    text_len = len(text)
+    while pos < text_len:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        line_number += 1
+        line_end = text.find("\n", pos)
+        line_end = text_len if line_end == -1 else line_end + 1
+        line = text[pos:line_end]
+        if multi:
+            terms = pattern.matching_terms(line)
+        else:
+            terms = [None] if pattern.search(line) else []
+        if terms:
+            results.extend(_line_results(text, pos, line_end, line_number, terms,
+                                         rel_path, repo_dirname, context_lines))
+        pos = line_end
+    return results
+
+
+def search_text(text: str, rel_path: str, pattern, repo_dirname: str,
+                cancel_event=None, context_lines: int = 0) -> List[Dict]:
+    if _needs_line_scan(pattern):
+        return _search_text_lines(text, rel_path, pattern, repo_dirname, cancel_event,
+                                  context_lines)
+    lowered = _lowered_for_literal(text) if getattr(pattern, "fast", False) else None
+    find = _match_finder(text, lowered, pattern)
+    multi = isinstance(pattern, MultiPattern)
+    results = []
+    line_number = 1
+    counted_until = 0
+    pos = 0
+    text_len = len(text)
+    while pos < text_len:
+        span = find(pos)
+        if span is None:
+            break
+        if cancel_event is not None and cancel_event.is_set():
+            break
+
+        match_start, match_end = span
+        line_start = text.rfind("\n", 0, match_start) + 1
+        if line_start >= text_len:
+            break
+        line_end = text.find("\n", match_start)
+        line_end = text_len if line_end == -1 else line_end + 1
+        line = text[line_start:line_end]
+
+        if multi:
+            terms = pattern.matching_terms(
+                line, lowered[line_start:line_end] if lowered is not None else None)
+        elif match_end <= line_end or pattern.search(line):
+            terms = [None]
+        else:
+            # Um match que atravessa a quebra de linha só vale se a linha casar sozinha
+            terms = []
+
+        if terms:
+            line_number += text.count("\n", counted_until, line_start)
+            counted_until = line_start
+            results.extend(_line_results(text, line_start, line_end, line_number, terms,
+                                         rel_path, repo_dirname, context_lines))
+        pos = line_end
+    return results
+
+
+def _search_file_buffer(file_path: Path, rel_path: str, pattern,
+                        repo_dirname: str, cancel_event=None, skip_binary: bool = False,
+                        stats: Optional[FilterStats] = None, context_lines: int = 0) -> List[Dict]:
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if skip_binary and is_binary(data):
+        if stats is not None:
+            stats.skip("binário", len(data), rel_path)
+        return []
+    text = decode_text(data)
+    start = time.perf_counter()
+    results = search_text(text, rel_path, pattern, repo_dirname, cancel_event, context_lines)
+    if stats is not None:
+        stats.scanned(len(data), time.perf_counter() - start)
+    return results
+
+
+def search_file(repo_path: Path, rel_path: str, pattern,
+                repo_dirname: str, cancel_event=None, scan_mode: str = "buffer",
+                skip_binary: bool = False, stats: Optional[FilterStats] = None,
+                context_lines: int = 0) -> List[Dict]:
+    file_path = Path(repo_path) / rel_path
+    try:
+        if scan_mode == "line":
+            if skip_binary:
+                with open(file_path, "rb") as f:
+                    if is_binary(f.read(BINARY_SNIFF_BYTES)):
+                        if stats is not None:
+                            stats.skip("binário", os.fstat(f.fileno()).st_size, rel_path)
+                        return []
+            # Linha a linha, leitura e regex se misturam; o tempo medido inclui as duas
+            start = time.perf_counter()
+            results = _search_file_lines(file_path, rel_path, pattern, repo_dirname, cancel_event,
+                                         context_lines)
+            if stats is not None:
+                stats.scanned(os.path.getsize(file_path), time.perf_counter() - start)
+            return results
+        return _search_file_buffer(file_path, rel_path, pattern, repo_dirname, cancel_event,
+                                   skip_binary, stats, context_lines)
+    except (PermissionError, UnicodeDecodeError, IOError):
+        return []
+
+
+def _init_worker(cancel_event):
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+
+def _search_chunk(repo_path: str, rel_paths: List[str], search_string: Query,
+                  repo_dirname: str, scan_mode: str, skip_binary: bool, context_lines: int = 0):
+    pattern = compile_pattern(search_string)
+    # Os caminhos pulados voltam junto: a deduplicação por blob guarda o motivo
+    stats = FilterStats(record_paths=True)
+    results = []
+    for rel_path in rel_paths:
+        if _worker_cancel_event is not None and _worker_cancel_event.is_set():
+            break
+        results.extend(search_file(repo_path, rel_path, pattern, repo_dirname,
+                                   _worker_cancel_event, scan_mode, skip_binary, stats,
+                                   context_lines))
+    return results, stats
+
+
+def _pool_context():
+    # Com fork, um worker criado enquanto outra thread inicia o git herda o pipe interno do
+    # subprocess e o deixa esperando para sempre; o forkserver cria os workers a partir de
+    # um processo sem threads
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+class ProcessSearchBackend:
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self._context = _pool_context()
+        self.cancel_event = self._context.Event()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._context,
+                    initializer=_init_worker,
+                    initargs=(self.cancel_event,),
+                )
+            return self._executor
+
+    def _chunks(self, rel_paths: List[str]) -> List[List[str]]:
+        # Blocos menores que chunk_size quando há poucos arquivos, para ocupar todos os núcleos
+        size = min(self.chunk_size, max(1, len(rel_paths) // (self.workers * 4)))
+        return [rel_paths[i:i + size] for i in range(0, len(rel_paths), size)]
+
+    def iter_search(self, repo_path: Path, rel_paths: List[str], search_string: Query,
+                    repo_dirname: str, progress_callback=None, scan_mode: str = "buffer",
+                    skip_binary: bool = False, stats: Optional[FilterStats] = None,
+                    context_lines: int = 0, cancel_event=None) -> Iterator[Dict]:
+        # cancel_event (da busca) só descarta os blocos ainda não iniciados; self.cancel_event
+        # também interrompe os que estão nos workers
+        executor = self._get_executor()
+        chunks = self._chunks(rel_paths)
+        futures = [
+            executor.submit(_search_chunk, str(repo_path), chunk, search_string,
+                            repo_dirname, scan_mode, skip_binary, context_lines)
+            for chunk in chunks
+        ]
+
+        files_done = 0
+        for future, chunk in zip(futures, chunks):
+            if self.cancel_event.is_set() or (cancel_event is not None and cancel_event.is_set()):
+                future.cancel()
+                continue
+            chunk_results, chunk_stats = future.result()
+            if stats is not None:
+                stats.merge(chunk_stats)
+            yield from chunk_results
+            files_done += len(chunk)
+            if progress_callback:
+                progress_callback(f"Processando arquivos... ({files_done})")
+
+    def search(self, repo_path: Path, rel_paths: List[str], search_string: Query,
+               repo_dirname: str, progress_callback=None, scan_mode: str = "buffer",
+               skip_binary: bool = False, stats: Optional[FilterStats] = None,
+               context_lines: int = 0) -> List[Dict]:
+        return list(self.iter_search(repo_path, rel_paths, search_string, repo_dirname,
+                                     progress_callback, scan_mode, skip_binary, stats,
+                                     context_lines))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def reset(self):
+        self.cancel_event.clear()
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
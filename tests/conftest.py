@@ -0,0 +1,74 @@
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import pytest
+
+# Os módulos do projeto ficam na raiz, sem pacote
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from repo_searcher import RepoSearcher  # noqa: E402
+
+
+def git(cwd: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True,
+                          text=True).stdout
+
+
+class RemoteRepo:
+    """Repositório bare local (o "remoto") e uma cópia de trabalho que publica nele."""
+
+    def __init__(self, root: Path, name: str):
+        self.name = name
+        self.remote = root / "remotes" / f"{name}.git"
+        self.work = root / "work" / name
+        self.remote.parent.mkdir(parents=True, exist_ok=True)
+        self.work.mkdir(parents=True)
+        git(root, "init", "--quiet", "--bare", "-b", "main", str(self.remote))
+        git(self.work, "init", "--quiet", "-b", "main")
+        git(self.work, "remote", "add", "origin", str(self.remote))
+
+    def commit(self, files: Dict[str, Optional[Union[str, bytes]]], message: str = "commit"):
+        # None remove o arquivo
+        for rel_path, content in files.items():
+            path = self.work / rel_path
+            if content is None:
+                path.unlink()
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            path.write_bytes(content)
+        git(self.work, "add", "-A")
+        git(self.work, "-c", "user.name=Teste", "-c", "user.email=teste@example.com",
+            "commit", "--quiet", "-m", message)
+        git(self.work, "push", "--quiet", "origin", "main")
+
+
+class LocalRepoSearcher(RepoSearcher):
+    """Clona dos remotos bare locais (file://) em vez do GitLab/GitHub."""
+
+    def __init__(self, remotes_dir: Path, **kwargs):
+        super().__init__(token="", **kwargs)
+        self.remotes_dir = remotes_dir
+
+    def build_url(self, repo_name: str) -> str:
+        return (self.remotes_dir / f"{repo_name}.git").as_uri()
+
+
+@pytest.fixture
+def make_remote(tmp_path):
+    def make(name: str, files: Dict[str, Union[str, bytes]]) -> RemoteRepo:
+        repo = RemoteRepo(tmp_path, name)
+        repo.commit(files, "inicial")
+        return repo
+    return make
+
+
+@pytest.fixture
+def make_searcher(tmp_path):
+    def make(**kwargs) -> LocalRepoSearcher:
+        kwargs.setdefault("base_dir", tmp_path / "repos_temp")
+        return LocalRepoSearcher(tmp_path / "remotes", **kwargs)
+    return make
@@ -0,0 +1,55 @@
+import pytest
+
+from blob_cache import BlobMatchCache
+
+
+MODES = [("full", "thread"), ("full", "process"), ("mirror", "git")]
+
+BINARY = b"\x00\x01\x02 TODO binary " * 64
+FILES = {
+    "src/a.py": "x = 1  # TODO a\n",
+    "copy/a.py": "x = 1  # TODO a\n",
+    "plain.txt": "nothing to see\n",
+    "data.bin": BINARY,
+    "copy/data.bin": BINARY,
+}
+
+
+def hits(results):
+    return sorted((result["repo"], result["file"], result["line_number"], result["line"])
+                  for result in results)
+
+
+@pytest.mark.parametrize("clone_mode, backend", MODES)
+def test_duplicate_blobs_are_fanned_out_and_counted(make_remote, make_searcher,
+                                                    clone_mode, backend):
+    make_remote("one", FILES)
+    make_remote("two", FILES)
+    repos = ["one", "two"]
+    expected = hits(make_searcher(clone_mode=clone_mode, search_backend=backend,
+                                  dedup_blobs=False).search_repos(repos, "TODO"))
+    assert len(expected) == 4
+
+    for run in range(2):
+        searcher = make_searcher(clone_mode=clone_mode, search_backend=backend, dedup_blobs=True)
+        assert hits(searcher.search_repos(repos, "TODO")) == expected, run
+
+        stats = searcher.filter_stats
+        # Os quatro binários continuam pulados, venham da leitura ou do cache de blobs
+        assert stats.by_reason == {"binário": 4}, run
+        # Cada arquivo de texto é lido ou reaproveitado, nunca as duas coisas
+        assert stats.files_scanned + stats.files_reused == 6, run
+        # copy/a.py repete src/a.py no mesmo repositório; entre repositórios depende da ordem
+        assert stats.files_reused >= 2, run
+
+
+def test_skip_reason_survives_reload(tmp_path):
+    cache = BlobMatchCache(tmp_path, "TODO", "worktree", skip_binary=True)
+    cache.store("a" * 40, [], "binário")
+    cache.store("b" * 40, [])
+    cache.save()
+
+    reloaded = BlobMatchCache(tmp_path, "TODO", "worktree", skip_binary=True)
+
+    assert reloaded.lookup("a" * 40) == [] and reloaded.skip_reason("a" * 40) == "binário"
+    assert reloaded.lookup("b" * 40) == [] and reloaded.skip_reason("b" * 40) is None
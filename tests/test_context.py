@@ -0,0 +1,89 @@
+import json
+import threading
+from http.client import HTTPConnection
+
+import pytest
+
+from repo_searcher import RepoSearcher
+from search_daemon import RequestError, SearchDaemon, _DaemonHTTPServer
+
+
+LINES = "".join(f"line {i}\n" for i in range(1, 31))
+BAD_PATHS = ["/etc/passwd", "../outside.txt", "src/../../outside.txt", "..\\outside.txt"]
+
+
+@pytest.mark.parametrize("clone_mode, backend", [("full", "thread"), ("mirror", "git")])
+def test_get_context_reads_the_searched_content(make_remote, make_searcher, clone_mode, backend):
+    make_remote("app", {"src/file.txt": LINES, "crlf.txt": LINES.replace("\n", "\r\n")})
+    searcher = make_searcher(clone_mode=clone_mode, search_backend=backend)
+    searcher.refresh_repos(["app"])
+
+    assert searcher.get_context("app", "src/file.txt", 10, 2) == [
+        (number, f"line {number}") for number in range(8, 13)]
+    assert searcher.get_context("app", "crlf.txt", 1, 1) == [(1, "line 1"), (2, "line 2")]
+    assert searcher.get_context("app", "src/file.txt", 30, 2)[-1] == (30, "line 30")
+
+
+@pytest.mark.parametrize("rel_path", BAD_PATHS)
+def test_get_context_rejects_paths_outside_the_clone(make_remote, make_searcher, tmp_path,
+                                                     rel_path):
+    (tmp_path / "outside.txt").write_text("secret\n")
+    make_remote("app", {"src/file.txt": LINES})
+    searcher = make_searcher()
+    searcher.refresh_repos(["app"])
+
+    with pytest.raises(ValueError):
+        searcher.get_context("app", rel_path, 1)
+
+
+@pytest.fixture
+def daemon(make_remote, tmp_path, monkeypatch):
+    remotes = tmp_path / "remotes"
+    monkeypatch.setattr(RepoSearcher, "build_url",
+                        lambda self, repo_name: (remotes / f"{repo_name}.git").as_uri())
+    make_remote("app", {"src/file.txt": LINES})
+    search_daemon = SearchDaemon("", base_dir=tmp_path / "daemon", gitlab_url=None,
+                                 repos=["app"], clone_mode="full", search_backend="thread")
+    search_daemon.ensure_cloned(["app"])
+    return search_daemon
+
+
+@pytest.fixture
+def daemon_server(daemon):
+    server = _DaemonHTTPServer(("127.0.0.1", 0), daemon)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post_context(server, payload):
+    connection = HTTPConnection("127.0.0.1", server.server_address[1])
+    connection.request("POST", "/context", json.dumps(payload))
+    response = connection.getresponse()
+    body = json.loads(response.read())
+    connection.close()
+    return response.status, body
+
+
+def test_daemon_context_returns_lines(daemon_server):
+    status, body = post_context(daemon_server, {"repo": "app", "file": "src/file.txt",
+                                                "line_number": 2, "context_lines": 1})
+
+    assert status == 200
+    assert body == {"lines": [[1, "line 1"], [2, "line 2"], [3, "line 3"]]}
+
+
+@pytest.mark.parametrize("rel_path", BAD_PATHS)
+def test_daemon_context_rejects_paths_outside_the_clone(daemon, daemon_server, rel_path):
+    with pytest.raises(RequestError):
+        daemon.context({"repo": "app", "file": rel_path, "line_number": 1})
+
+    status, body = post_context(daemon_server, {"repo": "app", "file": rel_path, "line_number": 1})
+    assert status == 400 and "inválido" in body["error"]
+
+
+def test_daemon_context_rejects_unwatched_repos(daemon_server):
+    status, _ = post_context(daemon_server, {"repo": "other", "file": "a.txt", "line_number": 1})
+
+    assert status == 400
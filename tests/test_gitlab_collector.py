@@ -0,0 +1,228 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
+
+from gitlab_collector import GitLabCollector
+
+
+class StubGitLab:
+    """Servidor HTTP local que imita a paginação de /groups/:id/projects do GitLab.
+
+    Cada página tem um ETag derivado do conteúdo e responde 304 a um If-None-Match igual.
+    """
+
+    def __init__(self):
+        self.projects = {}
+        self.requests = []
+        self.statuses = []
+        self.rate_limited = {}
+        self.delay = 0.0
+        self.block = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stub.handle(self)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add_group(self, group, count, forks=()):
+        self.projects[group] = [
+            {"path_with_namespace": f"{group}/p{i:03d}",
+             "forked_from_project": {"id": i} if i in forks else None}
+            for i in range(count)
+        ]
+
+    def requested_pages(self, group):
+        return [page for requested, page in self.requests if requested == group]
+
+    def page_statuses(self, group):
+        return [(page, status) for requested, page, status in self.statuses if requested == group]
+
+    def handle(self, handler):
+        url = urlparse(handler.path)
+        query = parse_qs(url.query)
+        group = unquote(url.path.split("/groups/")[1].rsplit("/projects", 1)[0])
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", ["20"])[0])
+        with self._lock:
+            self.requests.append((group, page))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            limited = self.rate_limited.get(group, 0)
+            if limited:
+                self.rate_limited[group] = limited - 1
+        try:
+            if group in self.block:
+                self.block[group].wait(5)
+            time.sleep(self.delay)
+            items = self.projects[group]
+            body = json.dumps(items[(page - 1) * per_page:page * per_page]).encode()
+            etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+            if limited:
+                status = 429
+                body = b'{"message": "429 Too Many Requests"}'
+                handler.send_response(status)
+                handler.send_header("Retry-After", "0")
+            elif handler.headers.get("If-None-Match") == etag:
+                # Como o GitLab: 304 sem corpo e sem cabeçalhos de paginação
+                status = 304
+                body = b""
+                handler.send_response(status)
+                handler.send_header("ETag", etag)
+            else:
+                status = 200
+                handler.send_response(status)
+                more = page * per_page < len(items)
+                handler.send_header("X-Next-Page", str(page + 1) if more else "")
+                handler.send_header("ETag", etag)
+            with self._lock:
+                self.statuses.append((group, page, status))
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self):
+        for event in self.block.values():
+            event.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def gitlab_stub():
+    stub = StubGitLab()
+    yield stub
+    stub.close()
+
+
+def make_collector(stub, tmp_path=None, **kwargs):
+    return GitLabCollector("token", stub.url, cache_dir=tmp_path, **kwargs)
+
+
+def test_multi_page_listing_filters_forks(gitlab_stub):
+    gitlab_stub.add_group("grupo", 250, forks={3, 180})
+
+    repos = make_collector(gitlab_stub).get_group_repositories("grupo")
+
+    assert gitlab_stub.requested_pages("grupo") == [1, 2, 3]
+    assert len(repos) == 248
+    assert "grupo/p003" not in repos and "grupo/p180" not in repos
+    assert repos[0] == "grupo/p000" and repos[-1] == "grupo/p249"
+
+
+def test_multiple_groups_keep_order_and_dedup(gitlab_stub):
+    gitlab_stub.add_group("a", 3)
+    gitlab_stub.add_group("b", 2)
+    gitlab_stub.projects["b"].append({"path_with_namespace": "a/p001", "forked_from_project": None})
+
+    repos = make_collector(gitlab_stub).get_multiple_groups_repositories(["a", "b"])
+
+    assert repos == ["a/p000", "a/p001", "a/p002", "b/p000", "b/p001"]
+
+
+def test_concurrent_requests_are_bounded(gitlab_stub):
+    gitlab_stub.delay = 0.2
+    groups = [f"g{i}" for i in range(6)]
+    for group in groups:
+        gitlab_stub.add_group(group, 1)
+
+    start = time.perf_counter()
+    repos = make_collector(gitlab_stub, max_workers=3).get_multiple_groups_repositories(groups)
+    elapsed = time.perf_counter() - start
+
+    assert len(repos) == 6
+    assert 1 < gitlab_stub.max_in_flight <= 3
+    # Seis grupos de 0,2 s com três em paralelo: duas rodadas, não seis
+    assert elapsed < 6 * gitlab_stub.delay
+
+
+def test_rate_limited_request_is_retried(gitlab_stub):
+    gitlab_stub.add_group("grupo", 150)
+    gitlab_stub.rate_limited["grupo"] = 2
+
+    repos = make_collector(gitlab_stub).get_group_repositories("grupo")
+
+    assert len(repos) == 150
+    # Duas respostas 429 na primeira página, depois as duas páginas normais
+    assert gitlab_stub.requested_pages("grupo") == [1, 1, 1, 2]
+
+
+def test_cancel_skips_pending_pages_and_groups(gitlab_stub, tmp_path):
+    gitlab_stub.add_group("lento", 150)
+    gitlab_stub.add_group("outro", 1)
+    gitlab_stub.block["lento"] = threading.Event()
+    collector = make_collector(gitlab_stub, tmp_path, max_workers=1)
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(
+        collector.get_multiple_groups_repositories(["lento", "outro"])))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while not gitlab_stub.requests and time.monotonic() < deadline:
+        time.sleep(0.01)
+    collector.cancel()
+    gitlab_stub.block["lento"].set()
+    worker.join(5)
+
+    assert not worker.is_alive()
+    assert result == [[]]
+    assert gitlab_stub.requested_pages("lento") == [1]
+    assert gitlab_stub.requested_pages("outro") == []
+    # A listagem parcial não fica no cache: a próxima chamada busca tudo de novo
+    assert len(collector.get_group_repositories("lento")) == 150
+
+
+def test_unchanged_pages_are_reused_from_cache(gitlab_stub, tmp_path):
+    gitlab_stub.add_group("grupo", 250)
+    collector = make_collector(gitlab_stub, tmp_path, cache_ttl=0)
+    first = collector.get_group_repositories("grupo")
+
+    second = make_collector(gitlab_stub, tmp_path, cache_ttl=0).get_group_repositories("grupo")
+
+    assert second == first
+    assert gitlab_stub.page_statuses("grupo") == [(1, 200), (2, 200), (3, 200),
+                                                  (1, 304), (2, 304), (3, 304)]
+
+
+def test_changed_etag_refreshes_only_that_page(gitlab_stub, tmp_path):
+    gitlab_stub.add_group("grupo", 250)
+    collector = make_collector(gitlab_stub, tmp_path, cache_ttl=0)
+    collector.get_group_repositories("grupo")
+
+    gitlab_stub.projects["grupo"][150]["forked_from_project"] = {"id": 1}
+    repos = collector.get_group_repositories("grupo")
+
+    assert len(repos) == 249 and "grupo/p150" not in repos
+    assert gitlab_stub.page_statuses("grupo")[3:] == [(1, 304), (2, 200), (3, 304)]
+
+
+def test_new_item_on_a_full_last_page_is_found(gitlab_stub, tmp_path):
+    gitlab_stub.add_group("grupo", 200)
+    collector = make_collector(gitlab_stub, tmp_path, cache_ttl=0)
+    assert len(collector.get_group_repositories("grupo")) == 200
+
+    # Projeto novo no fim da ordem: cai numa página que ainda não existia
+    gitlab_stub.projects["grupo"].append({"path_with_namespace": "grupo/zzz",
+                                          "forked_from_project": None})
+    repos = collector.get_group_repositories("grupo")
+
+    assert repos[-1] == "grupo/zzz"
+    assert gitlab_stub.page_statuses("grupo")[2:] == [(1, 304), (2, 304), (3, 200)]
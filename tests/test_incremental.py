@@ -0,0 +1,47 @@
+import pytest
+
+
+MODES = [("full", "thread"), ("mirror", "git")]
+
+
+def hits(results):
+    return sorted((result["file"], result["line_number"], result["line"]) for result in results)
+
+
+@pytest.mark.parametrize("clone_mode, backend", MODES)
+def test_changed_and_deleted_files_are_searched_again(make_remote, make_searcher,
+                                                      clone_mode, backend):
+    repo = make_remote("app", {
+        "kept.py": "TODO kept\n",
+        "changed.py": "TODO old one\nTODO old two\n",
+        "deleted.py": "TODO deleted\n",
+    })
+
+    def search():
+        searcher = make_searcher(clone_mode=clone_mode, search_backend=backend, incremental=True)
+        return searcher, hits(searcher.search_repos(["app"], "TODO"))
+
+    _, first = search()
+    assert [hit[0] for hit in first] == ["changed.py", "changed.py", "deleted.py", "kept.py"]
+
+    repo.commit({"changed.py": "nothing\nTODO new\n", "deleted.py": None, "added.py": "TODO added\n"})
+    searcher, second = search()
+
+    assert second == [("added.py", 1, "TODO added"), ("changed.py", 2, "TODO new"),
+                      ("kept.py", 1, "TODO kept")]
+    # Só os arquivos do diff foram lidos; kept.py veio dos resultados guardados
+    assert searcher.filter_stats.files_scanned == 2
+    full = make_searcher(clone_mode=clone_mode, search_backend=backend,
+                         base_dir=searcher.base_dir.parent / "full")
+    assert second == hits(full.search_repos(["app"], "TODO"))
+
+
+def test_unchanged_commit_reuses_stored_results(make_remote, make_searcher):
+    make_remote("app", {"a.py": "TODO a\n"})
+    make_searcher(incremental=True).search_repos(["app"], "TODO")
+
+    searcher = make_searcher(incremental=True)
+    results = searcher.search_repos(["app"], "TODO")
+
+    assert hits(results) == [("a.py", 1, "TODO a")]
+    assert searcher.filter_stats.files_scanned == 0
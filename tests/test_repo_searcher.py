@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from conftest import git
+from path_filters import FileFilter
+
+
+def test_shallow_clones_only_search_head(make_searcher):
+    with pytest.raises(ValueError):
+        make_searcher(clone_mode="shallow", search_backend="git", search_ref="develop")
+
+    assert make_searcher(clone_mode="shallow", search_backend="git").search_ref == "HEAD"
+
+
+def test_non_head_ref_is_searched_in_full_clones(make_remote, make_searcher):
+    repo = make_remote("app", {"a.py": "TODO main\n"})
+    repo.commit({"a.py": "TODO develop\n"})
+    git(repo.work, "push", "--quiet", "origin", "HEAD~1:refs/heads/main", "--force")
+    git(repo.work, "push", "--quiet", "origin", "HEAD:refs/heads/develop")
+
+    searcher = make_searcher(clone_mode="mirror", search_backend="git", search_ref="develop")
+
+    assert [result["line"] for result in searcher.search_repos(["app"], "TODO")] == ["TODO develop"]
+
+
+def test_index_is_kept_per_listing_mode(make_remote, make_searcher):
+    make_remote("app", {".gitignore": "build/\n", "a.py": "TODO tracked\n"})
+    index_cache = {}
+    searcher = make_searcher(use_index=True, index_cache=index_cache)
+    assert [result["file"] for result in searcher.search_repos(["app"], "TODO")] == ["a.py"]
+    (clone,) = [path for path in searcher.base_dir.iterdir() if not path.name.startswith(".")]
+    (clone / "build").mkdir()
+    (clone / "build" / "out.txt").write_text("TODO ignored\n")
+
+    # Sem .gitignore o arquivo ignorado é candidato, mesmo com o índice do outro modo em memória
+    searcher = make_searcher(use_index=True, index_cache=index_cache, update_repos=False,
+                             file_filter=FileFilter(use_gitignore=False))
+    files = sorted(result["file"] for result in searcher.search_repos(["app"], "TODO"))
+    assert files == ["a.py", os.path.join("build", "out.txt")]
+
+    # E o índice respeitando o .gitignore continua sem ele, inclusive o salvo em disco
+    searcher = make_searcher(use_index=True, update_repos=False)
+    assert [result["file"] for result in searcher.search_repos(["app"], "TODO")] == ["a.py"]
+
+
+def test_cancel_before_first_next_is_kept(make_remote, make_searcher):
+    make_remote("app", {"a.py": "TODO a\n"})
+    searcher = make_searcher()
+    searcher.refresh_repos(["app"])
+
+    results = searcher.iter_results(["app"], "TODO")
+    searcher.cancel()
+
+    assert list(results) == []
+    assert searcher.filter_stats.files_scanned == 0
+    # A busca seguinte começa sem o cancelamento anterior
+    assert len(searcher.search_repos(["app"], "TODO")) == 1
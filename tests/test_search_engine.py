@@ -0,0 +1,88 @@
+import re
+
+import pytest
+
+from search_engine import LiteralPattern, compile_pattern, search_file, search_text
+
+
+CONTENTS = {
+    "lf": b"alpha\nbeta TODO\ngamma\n",
+    "crlf": b"alpha\r\nbeta TODO\r\ngamma\r\nTODO last\r\n",
+    "cr": b"alpha\rTODO beta\rgamma",
+    "mixed": b"TODO one\r\ntwo\rthree TODO\nfour\r\n\r\nTODO six",
+    "no_trailing_newline": b"first\nsecond\nTODO at eof",
+    "blank_lines": b"\n\nTODO\n\n\nTODO\n",
+}
+
+PATTERNS = ["TODO", r"^TODO", r"TODO$", r"\bt\w+", r"\Atodo", r"todo\Z", r"(?<=beta )todo",
+            r"o\s+t", ["TODO", "gamma"]]
+
+
+def scan(tmp_path, data: bytes, query, scan_mode: str, context_lines: int = 0):
+    (tmp_path / "file.txt").write_bytes(data)
+    return search_file(tmp_path, "file.txt", compile_pattern(query), "repo",
+                       scan_mode=scan_mode, context_lines=context_lines)
+
+
+@pytest.mark.parametrize("name", sorted(CONTENTS))
+@pytest.mark.parametrize("query", PATTERNS, ids=str)
+def test_buffer_scan_matches_line_scan(tmp_path, name, query):
+    data = CONTENTS[name]
+    assert scan(tmp_path, data, query, "buffer") == scan(tmp_path, data, query, "line")
+
+
+@pytest.mark.parametrize("name", sorted(CONTENTS))
+def test_buffer_scan_context_matches_line_scan(tmp_path, name):
+    data = CONTENTS[name]
+    assert (scan(tmp_path, data, "TODO", "buffer", context_lines=2)
+            == scan(tmp_path, data, "TODO", "line", context_lines=2))
+
+
+def test_line_numbers_at_crlf_and_eof(tmp_path):
+    results = scan(tmp_path, b"a\r\nb\r\nTODO\r\nc\rTODO\nd\nTODO", "TODO", "buffer")
+
+    assert [(result["line_number"], result["line"]) for result in results] == [
+        (3, "TODO"), (5, "TODO"), (7, "TODO")]
+
+
+CASE_TEXTS = [
+    "Istanbul\nİstanbul\nıstanbul\nISTANBUL\n",
+    "the last straw\nſtraw hat\nSTRAW\n",
+    "İİİ is\nsome kİnd of\nwidth change İstanbul is\n",
+    "plain ascii only\nNothing Here\n",
+    "ünïcödé Ünïcödé\nÜNÏCÖDÉ\n",
+]
+
+CASE_LITERALS = ["istanbul", "stanbul", "STRAW", "st", "is", "kind", "ünïcödé", "here"]
+
+
+@pytest.mark.parametrize("text", CASE_TEXTS)
+@pytest.mark.parametrize("literal", CASE_LITERALS)
+def test_literal_fast_path_matches_ignorecase_regex(text, literal):
+    fast = compile_pattern(literal)
+    regex = re.compile(re.escape(literal), re.IGNORECASE)
+
+    assert isinstance(fast, LiteralPattern)
+    assert (search_text(text, "f.txt", fast, "repo")
+            == search_text(text, "f.txt", regex, "repo"))
+
+
+@pytest.mark.parametrize("text", CASE_TEXTS)
+def test_multi_pattern_matches_one_regex_per_term(text):
+    terms = ["istanbul", "STRAW", "is", "ünïcödé"]
+    expected = []
+    for term in terms:
+        for result in search_text(text, "f.txt", re.compile(re.escape(term), re.IGNORECASE), "repo"):
+            expected.append({**result, "term": term})
+    expected.sort(key=lambda result: (result["line_number"], terms.index(result["term"])))
+
+    assert search_text(text, "f.txt", compile_pattern(terms), "repo") == expected
+
+
+def test_multi_pattern_tags_each_term():
+    text = "TODO and FIXME\nonly fixme\nnothing\ntodo: fix\n"
+
+    results = search_text(text, "f.txt", compile_pattern(["TODO", "FIXME", r"fix\b"]), "repo")
+
+    assert [(result["line_number"], result["term"]) for result in results] == [
+        (1, "TODO"), (1, "FIXME"), (2, "FIXME"), (4, "TODO"), (4, r"fix\b")]
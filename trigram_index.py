@@ -0,0 +1,258 @@
+import os
+import re
+import pickle
+from pathlib import Path
+from typing import List, Optional, Set
+
+from search_engine import Query, read_text
+
+
+INDEX_VERSION = 1
+MAX_INDEXED_FILE_SIZE = 8 * 1024 * 1024
+
+_TRIGRAM_RE = re.compile(".{3}", re.DOTALL)
+_QUANTIFIER_RE = re.compile(r"\{(\d*)(?:,(\d*))?\}")
+_ESCAPE_OPERAND_SIZES = {"x": 2, "u": 4, "U": 8}
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    text = text.lower()
+    trigrams = set()
+    # Três passadas com deslocamento cobrem todos os trigramas sobrepostos
+    for offset in range(3):
+        trigrams.update(_TRIGRAM_RE.findall(text, offset))
+    return trigrams
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_escape_operand(pattern: str, i: int, escape: str) -> int:
+    # O que vem depois de \x, \u, \U, \N{...}, octais e referências (\1, \101) faz parte
+    # do escape, não é texto literal
+    if escape in _ESCAPE_OPERAND_SIZES:
+        return i + _ESCAPE_OPERAND_SIZES[escape]
+    if escape == "N" and pattern[i:i + 1] == "{":
+        end = pattern.find("}", i)
+        return len(pattern) if end == -1 else end + 1
+    if escape.isdigit():
+        while i < len(pattern) and pattern[i].isdigit():
+            i += 1
+    return i
+
+
+def literal_runs(search_string: str) -> List[str]:
+    try:
+        compiled = re.compile(search_string)
+    except re.error:
+        # Mesmo fallback de compile_pattern: a busca vira literal
+        return [search_string]
+    if compiled.flags & re.VERBOSE:
+        return []
+
+    runs = []
+    current = []
+    i = 0
+    while i < len(search_string):
+        c = search_string[i]
+        if c == "|":
+            # Alternativas não obrigam nenhum literal
+            return []
+        if c == "\\":
+            nxt = search_string[i + 1:i + 2]
+            if nxt.isalnum():
+                runs.append("".join(current))
+                current = []
+                i = _skip_escape_operand(search_string, i + 2, nxt)
+            else:
+                current.append(nxt)
+                i += 2
+            continue
+        if c in "*?":
+            if current:
+                current.pop()
+            runs.append("".join(current))
+            current = []
+        elif c == "{":
+            quantifier = _QUANTIFIER_RE.match(search_string, i)
+            if quantifier:
+                if current and quantifier.group(1) in ("", "0"):
+                    current.pop()
+                runs.append("".join(current))
+                current = []
+                i = quantifier.end()
+                continue
+            current.append(c)
+        elif c in ".^$+)":
+            runs.append("".join(current))
+            current = []
+        elif c == "[":
+            runs.append("".join(current))
+            current = []
+            i = _skip_class(search_string, i)
+            continue
+        elif c == "(":
+            runs.append("".join(current))
+            current = []
+            i = _skip_group(search_string, i)
+            continue
+        else:
+            current.append(c)
+        i += 1
+    runs.append("".join(current))
+    return [run for run in runs if len(run) >= 3]
+
+
+def query_trigrams(search_string: str) -> Set[str]:
+    trigrams = set()
+    for run in literal_runs(search_string):
+        trigrams.update(extract_trigrams(run))
+    return trigrams
+
+
+class TrigramIndex:
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.commit = None
+        self.paths = {}
+        self.postings = {}
+        self.unindexed = set()
+        self._next_id = 0
+
+    @classmethod
+    def load(cls, index_path: Path) -> "TrigramIndex":
+        index = cls(index_path)
+        try:
+            with open(index.index_path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.commit = data["commit"]
+        index.paths = data["paths"]
+        index.postings = data["postings"]
+        index.unindexed = data["unindexed"]
+        index._next_id = data["next_id"]
+        return index
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "commit": self.commit,
+                "paths": self.paths,
+                "postings": self.postings,
+                "unindexed": self.unindexed,
+                "next_id": self._next_id,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.index_path)
+
+    def _add_file(self, repo_path: Path, rel_path: str):
+        file_id = self._next_id
+        self._next_id += 1
+        self.paths[rel_path] = file_id
+
+        file_path = Path(repo_path) / rel_path
+        try:
+            if file_path.stat().st_size > MAX_INDEXED_FILE_SIZE:
+                self.unindexed.add(file_id)
+                return
+            trigrams = extract_trigrams(read_text(file_path))
+        except OSError:
+            self.unindexed.add(file_id)
+            return
+
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                self.postings[trigram] = {file_id}
+            else:
+                posting.add(file_id)
+
+    def build(self, repo_path: Path, rel_paths: List[str], commit: Optional[str]):
+        self.paths = {}
+        self.postings = {}
+        self.unindexed = set()
+        self._next_id = 0
+        for rel_path in rel_paths:
+            self._add_file(repo_path, rel_path)
+        self.commit = commit
+
+    def update(self, repo_path: Path, changed_paths: List[str], commit: Optional[str]):
+        removed_ids = set()
+        for rel_path in changed_paths:
+            file_id = self.paths.pop(rel_path, None)
+            if file_id is not None:
+                removed_ids.add(file_id)
+
+        if removed_ids:
+            self.unindexed -= removed_ids
+            for trigram in list(self.postings):
+                posting = self.postings[trigram]
+                posting -= removed_ids
+                if not posting:
+                    del self.postings[trigram]
+
+        for rel_path in changed_paths:
+            if (Path(repo_path) / rel_path).is_file():
+                self._add_file(repo_path, rel_path)
+        self.commit = commit
+
+    def _candidate_ids(self, search_string: str) -> Optional[Set[int]]:
+        trigrams = query_trigrams(search_string)
+        if not trigrams:
+            return None
+
+        matching_ids = None
+        for trigram in sorted(trigrams, key=lambda t: len(self.postings.get(t, ()))):
+            posting = self.postings.get(trigram)
+            if not posting:
+                return set()
+            matching_ids = set(posting) if matching_ids is None else matching_ids & posting
+            if not matching_ids:
+                break
+        return matching_ids
+
+    def candidates(self, search_string: Query) -> List[str]:
+        # Com vários termos o candidato precisa conter qualquer um deles
+        terms = [search_string] if isinstance(search_string, str) else search_string
+        matching_ids = set()
+        for term in terms:
+            term_ids = self._candidate_ids(term)
+            if term_ids is None:
+                return list(self.paths)
+            matching_ids |= term_ids
+
+        matching_ids |= self.unindexed
+        return [rel_path for rel_path, file_id in self.paths.items() if file_id in matching_ids]